@@ -0,0 +1,103 @@
+import pygame
+
+from renderer import Layer
+
+type Point = tuple[float, float]
+
+
+class SlideAnimation:
+    """
+    Tiles sliding from their old to their new place after a move.
+    `update` advances the slide in fixed steps of `1 / update_rate` seconds,
+    whatever the frame rate is, and `layers` interpolates the time left over,
+    so the slide is as smooth as the frame rate allows. The layers are built
+    once and only their positions are changed in place on every frame.
+    """
+
+    def __init__(
+        self,
+        tiles: list[tuple[pygame.Surface, Point, Point]],  # (surface, from, to)
+        underlay: list[Layer],
+        start: float,
+        duration: float = 0.1,
+        update_rate: int = 60,
+    ):
+        self.step = 1 / update_rate
+        self.steps = max(1, round(duration * update_rate))
+        self.count = 0  # steps taken
+        self.time = start
+        self.accumulator = 0.0
+
+        self.starts = [src for _, src, _ in tiles]
+        self.deltas = [(dst[0] - src[0], dst[1] - src[1]) for _, src, dst in tiles]
+        self.moving = [(surface, [*src]) for surface, src, _ in tiles]
+        self.frame: list[tuple[pygame.Surface, Point | list[float]]] = [
+            *underlay,
+            *self.moving,
+        ]
+
+    @property
+    def done(self) -> bool:
+        return self.count >= self.steps
+
+    def update(self, now: float) -> None:
+        """take the steps due by `now`, a `time.perf_counter` timestamp"""
+        self.accumulator += now - self.time
+        self.time = now
+        while self.accumulator >= self.step and not self.done:
+            self.count += 1
+            self.accumulator -= self.step
+
+    def layers(self) -> list[tuple[pygame.Surface, Point | list[float]]]:
+        """the underlay and the tiles at their current, interpolated places"""
+        t = min(1.0, (self.count + self.accumulator / self.step) / self.steps)
+        t = 1 - (1 - t) ** 2  # ease out
+        for (_, pos), (x, y), (dx, dy) in zip(self.moving, self.starts, self.deltas):
+            pos[0] = x + dx * t
+            pos[1] = y + dy * t
+        return self.frame
+
+
+if __name__ == "__main__":
+    from time import perf_counter
+
+    import config
+    from renderer import DirtyRenderer
+    from tile_drawer import draw_tile_using_config
+
+    pygame.init()
+    screen = pygame.display.set_mode(
+        (config.WINDOW_SIZE["width"], config.WINDOW_SIZE["height"])
+    )
+    renderer = DirtyRenderer(screen, config.BG_COLOR)
+
+    # every tile of a 6x9 board slides one cell to the right
+    size = config.TILE_SIZE
+    area = pygame.Rect(30, 20, 9 * size, 6 * size)
+    empty = draw_tile_using_config(0)
+    animation = SlideAnimation(
+        [
+            (
+                draw_tile_using_config(2 ** (i + j + 1)),
+                (area.x + j * size, area.y + i * size),
+                (area.x + (j + 1) * size, area.y + i * size),
+            )
+            for i in range(6)
+            for j in range(8)
+        ],
+        [
+            (empty, (area.x + j * size, area.y + i * size))
+            for i in range(6)
+            for j in range(9)
+        ],
+        start=perf_counter(),
+        duration=0.5,
+    )
+
+    frames = 0
+    start = perf_counter()
+    while not animation.done:
+        animation.update(perf_counter())
+        renderer.render_area(area, animation.layers())
+        frames += 1
+    print(f"{frames / (perf_counter() - start):.0f} frames/s")
@@ -4,6 +4,21 @@ from pathlib import Path
 
 is_dev_env: bool = not hasattr(sys, "frozen")
 base_path = Path(sys._MEIPASS if getattr(sys, "frozen", False) else os.path.curdir)  # type: ignore
+# files the player may edit, e.g. keymap.json, live next to the executable
+user_path = Path(
+    os.path.dirname(sys.executable) if getattr(sys, "frozen", False) else os.path.curdir
+)
+# files the game writes for itself, e.g. game records, live in the per-user
+# data directory of the platform, created when first written to
+if sys.platform == "win32":
+    data_root = os.environ.get("APPDATA") or os.path.expanduser("~/AppData/Roaming")
+elif sys.platform == "darwin":
+    data_root = os.path.expanduser("~/Library/Application Support")
+else:
+    data_root = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+data_path = Path(data_root) / "Classic2048"
 
 if __name__ == "__main__":
     print(base_path)
+    print(user_path)
+    print(data_path)
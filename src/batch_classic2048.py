@@ -0,0 +1,236 @@
+from typing import Sequence
+
+import numpy as np
+
+from classic2048 import DIRECTIONS, Direction, SpawnRNG, tile_score
+
+# score gained by merging two tiles of exponent `e` into one of `e + 1`,
+# exact while tiles stay below 2 ** 33 (int64 scores)
+MERGE_SCORE = np.array(
+    [tile_score(e + 1) - 2 * tile_score(e) if e else 0 for e in range(33)]
+    + [0] * (256 - 33),
+    dtype=np.int64,
+)
+
+
+def splitmix64(states: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """`classic2048.splitmix64` on an array of uint64 states"""
+    states = states + np.uint64(0x9E3779B97F4A7C15)
+    z = states.copy()
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return states, z ^ (z >> np.uint64(31))
+
+
+# rows of up to `TABLE_MAX_LENGTH` tiles below 2 ** 16 are slid by lookup
+TABLE_MAX_LENGTH = 4
+ROW_TABLES: dict[int, tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+
+def row_table(length: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Results, scores and changed flags of sliding every row of `length`
+    exponents below 16, indexed by the row packed one nibble per tile.
+    Built on first use.
+    """
+    if length not in ROW_TABLES:
+        keys = np.arange(16**length)
+        rows = ((keys[:, None] >> (4 * np.arange(length))) & 15).astype(np.uint8)
+        res, score, changed = BatchClassic2048.slide_left_generic(rows[:, None, :])
+        ROW_TABLES[length] = (res[:, 0, :], score, changed)
+    return ROW_TABLES[length]
+
+
+def direction_indices(directions: Sequence[Direction]) -> np.ndarray:
+    return np.array([DIRECTIONS.index(d) for d in directions], dtype=np.int8)
+
+
+class BatchClassic2048:
+    """
+    `n` games of `Classic2048` stepped together.
+    Boards are kept as tile exponents in one `(n, row, col)` uint8 array,
+    directions are indices into `DIRECTIONS`.
+    """
+
+    def __init__(
+        self,
+        n: int,
+        row: int = 4,
+        col: int = 4,
+        seeds: Sequence[int] | np.ndarray | None = None,
+        rng: SpawnRNG | None = None,
+    ):
+        """
+        Game `i` spawns tiles like `Classic2048(row, col, seeds[i])`, or like
+        `Classic2048(row, col, rng=rng.spawn(i))` if `rng` is given.
+        """
+        self.n: int = n
+        self.row: int = row
+        self.col: int = col
+        if rng is not None:
+            seeds = [rng.spawn(i).seed for i in range(n)]
+        elif seeds is None:
+            seeds = np.random.default_rng().integers(
+                0, 1 << 64, n, dtype=np.uint64, endpoint=False
+            )
+        self.rng_states: np.ndarray = np.array(
+            [int(seed) & ((1 << 64) - 1) for seed in seeds], dtype=np.uint64
+        )
+
+        self.exps: np.ndarray = np.zeros((n, row, col), dtype=np.uint8)
+        self.scores: np.ndarray = np.zeros(n, dtype=np.int64)
+        self.game_over: np.ndarray = np.zeros(n, dtype=bool)
+
+        self.generate_tiles(np.arange(n))
+
+    @property
+    def boards(self) -> np.ndarray:
+        """tile values, same as `Classic2048.board` for every game"""
+        return np.where(self.exps > 0, np.left_shift(1, self.exps, dtype=np.int64), 0)
+
+    def generate_tiles(self, idx: np.ndarray) -> None:
+        flat = self.exps.reshape(self.n, -1)
+        empty_games, empty_cells = np.nonzero(flat[idx] == 0)
+        empty_count = np.bincount(empty_games, minlength=len(idx))
+        first_empty = np.cumsum(empty_count) - empty_count
+        has_empty = empty_count > 0
+        idx, empty_count, first_empty = (
+            idx[has_empty],
+            empty_count[has_empty].astype(np.uint64),
+            first_empty[has_empty],
+        )
+
+        self.rng_states[idx], draws = splitmix64(self.rng_states[idx])
+        index = ((draws >> np.uint64(32)) * empty_count) >> np.uint64(32)
+        exp = np.where(draws & np.uint64(1), 2, 1).astype(np.uint8)
+
+        # empty cells are listed in row-major order for every game
+        flat[idx, empty_cells[first_empty + index.astype(np.intp)]] = exp
+        self.scores[idx] += exp == 2  # a new 4 scores `tile_score(2)` = 1
+
+    @staticmethod
+    def slide_left(exps: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Slide and merge every row of `(m, rows, length)` exponents to the left.
+        Returns the new exponents, the score gained by each board and
+        whether each board changed.
+        """
+        length = exps.shape[2]
+        if length > TABLE_MAX_LENGTH or exps.max(initial=0) >= 16:
+            return BatchClassic2048.slide_left_generic(exps)
+
+        rows, scores, changed = row_table(length)
+        keys = exps[..., 0].astype(np.intp)
+        for k in range(1, length):
+            keys |= exps[..., k].astype(np.intp) << (4 * k)
+        return rows[keys], scores[keys].sum(axis=1), changed[keys].any(axis=1)
+
+    @staticmethod
+    def slide_left_generic(
+        exps: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """`slide_left` for rows of any length and tiles"""
+        original = exps
+
+        # compress tiles to the left
+        order = np.argsort(exps == 0, axis=2, kind="stable")
+        exps = np.take_along_axis(exps, order, axis=2)
+
+        score = np.zeros(len(exps), dtype=np.int64)
+        for k in range(exps.shape[2] - 1):
+            merged = (exps[..., k] == exps[..., k + 1]) & (exps[..., k] != 0)
+            score += (MERGE_SCORE[exps[..., k]] * merged).sum(axis=1)
+            exps[..., k] += merged
+            exps[..., k + 1] *= ~merged
+
+        order = np.argsort(exps == 0, axis=2, kind="stable")
+        exps = np.take_along_axis(exps, order, axis=2)
+        changed = (exps != original).reshape(len(exps), -1).any(axis=1)
+        return exps, score, changed
+
+    @classmethod
+    def slide(
+        cls, exps: np.ndarray, direction: Direction
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """`slide_left` with `exps` turned so that `direction` points left"""
+        match direction:
+            case "left":
+                return cls.slide_left(exps)
+            case "right":
+                res, score, changed = cls.slide_left(exps[:, :, ::-1])
+                return res[:, :, ::-1], score, changed
+            case "up":
+                res, score, changed = cls.slide_left(exps.transpose(0, 2, 1))
+                return res.transpose(0, 2, 1), score, changed
+            case "down":
+                res, score, changed = cls.slide_left(
+                    exps.transpose(0, 2, 1)[:, :, ::-1]
+                )
+                return res[:, :, ::-1].transpose(0, 2, 1), score, changed
+
+    def move(self, directions: np.ndarray | Sequence[int]) -> np.ndarray:
+        """
+        Move every game to its direction in `directions`.
+        Returns a mask of the games that moved successfully.
+        """
+        directions = np.asarray(directions)
+        moved = np.zeros(self.n, dtype=bool)
+
+        for d, direction in enumerate(DIRECTIONS):
+            idx = np.flatnonzero((directions == d) & ~self.game_over)
+            if len(idx) == 0:
+                continue
+            res, score, changed = self.slide(self.exps[idx], direction)
+            idx = idx[changed]
+            self.exps[idx] = res[changed]
+            self.scores[idx] += score[changed]
+            moved[idx] = True
+
+        idx = np.flatnonzero(moved)
+        self.generate_tiles(idx)
+        self.game_over[idx] = self.is_game_over(idx)
+        return moved
+
+    def is_game_over(self, idx: np.ndarray | None = None) -> np.ndarray:
+        exps = self.exps if idx is None else self.exps[idx]
+        over = (exps != 0).reshape(len(exps), self.row * self.col).all(axis=1)
+
+        # only full boards need their neighbours compared
+        full = exps[over]
+        over[over] = ~(
+            (full[:, :, 1:] == full[:, :, :-1]).any(axis=(1, 2))
+            | (full[:, 1:, :] == full[:, :-1, :]).any(axis=(1, 2))
+        )
+        return over
+
+
+if __name__ == "__main__":
+    from time import perf_counter
+
+    from classic2048 import Classic2048
+
+    # results must be identical to the scalar engine for the same seeds
+    for row in range(2, 7):
+        for col in range(2, 10):
+            n = 20
+            batch = BatchClassic2048(n, row, col, seeds=range(n))
+            games = [Classic2048(row, col, seed) for seed in range(n)]
+            dir_rng = np.random.default_rng(row * 10 + col)
+            for _ in range(300):
+                directions = dir_rng.integers(0, 4, n)
+                moved = batch.move(directions)
+                for i, game in enumerate(games):
+                    assert game.move(DIRECTIONS[directions[i]]) == moved[i]
+                    assert game.board == batch.boards[i].tolist()
+                    assert game.score == batch.scores[i]
+                    assert game.game_over == batch.game_over[i]
+    print("scalar check passed")
+
+    n = 10000
+    batch = BatchClassic2048(n, seeds=range(n))
+    dir_rng = np.random.default_rng(0)
+    moves = 0
+    start = perf_counter()
+    for _ in range(100):
+        moves += int(batch.move(dir_rng.integers(0, 4, n, dtype=np.int8)).sum())
+    print(f"{moves / (perf_counter() - start):.0f} moves/s")
@@ -0,0 +1,305 @@
+import argparse
+import json
+import os
+import platform
+import sys
+from collections.abc import Callable
+from pathlib import Path
+from math import ceil
+from random import Random
+from statistics import median
+from time import perf_counter
+
+# before pygame is imported, benchmarks render offscreen
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+import config
+from classic2048 import Bitboard, Classic2048, Direction, merge
+from policies import valid_moves
+
+type Workload = tuple[Callable[[], object], int]  # (runs `ops` operations, ops)
+type Setup = Callable[[int], Workload]  # seed -> workload
+type Result = dict[str, float]
+# (board, score, seed, draws, move), the seed and draws give the spawn
+type Position = tuple[Bitboard, int, int, int, Direction]
+
+
+def positions(row: int, col: int, seed: int, count: int) -> list[Position]:
+    """`count` positions of seeded random games and the moves made from them"""
+    rng = Random(seed)
+    game = Classic2048(row, col, rng.getrandbits(64))
+    found: list[Position] = []
+    while len(found) < count:
+        if not (moves := valid_moves(game)):
+            game = Classic2048(row, col, rng.getrandbits(64))
+            continue
+        direction = rng.choice(moves)
+        found.append((game.bitboard, game.score, game.seed, game.draws, direction))
+        game.move(direction)
+    return found
+
+
+def move_setup(row: int, col: int) -> Setup:
+    def setup(seed: int) -> Workload:
+        game = Classic2048(row, col)
+        moves = positions(row, col, seed, 2000)
+
+        def run() -> None:
+            for bitboard, score, game_seed, draws, direction in moves:
+                game.bitboard, game.score = bitboard, score
+                game.seed, game.draws = game_seed, draws
+                game.game_over = False
+                game.move(direction)
+
+        return run, len(moves)
+
+    return setup
+
+
+def merge_setup(seed: int) -> Workload:
+    rng = Random(seed)
+    rows = [[rng.choice((0, 0, 1, 1, 2, 3)) for _ in range(4)] for _ in range(5000)]
+
+    def run() -> None:
+        for exps in rows:
+            merge(exps)
+
+    return run, len(rows)
+
+
+def boards(seed: int) -> tuple[Classic2048, list[Bitboard]]:
+    """a 4x4 game to set the boards of, and the boards"""
+    return Classic2048(), [position[0] for position in positions(4, 4, seed, 5000)]
+
+
+def is_game_over_setup(seed: int) -> Workload:
+    game, bitboards = boards(seed)
+
+    def run() -> None:
+        for bitboard in bitboards:
+            game.bitboard = bitboard
+            game.is_game_over()
+
+    return run, len(bitboards)
+
+
+def cal_score_setup(seed: int) -> Workload:
+    game, bitboards = boards(seed)
+
+    def run() -> None:
+        for bitboard in bitboards:
+            game.bitboard = bitboard
+            game.cal_score()
+
+    return run, len(bitboards)
+
+
+def init_display() -> None:
+    if pygame.display.get_surface() is None:
+        pygame.init()
+        pygame.display.set_mode(
+            (config.WINDOW_SIZE["width"], config.WINDOW_SIZE["height"])
+        )
+
+
+def tile_setup(cached: bool) -> Setup:
+    def setup(seed: int) -> Workload:
+        from tile_drawer import clear_tile_cache, draw_tile_using_config
+
+        init_display()
+        rng = Random(seed)
+        nums = [rng.choice([0] + [2**i for i in range(1, 14)]) for _ in range(2000)]
+
+        def run() -> None:
+            for num in nums:
+                if not cached:
+                    clear_tile_cache()
+                draw_tile_using_config(num)
+
+        return run, len(nums)
+
+    return setup
+
+
+def display_setup(seed: int) -> Workload:
+    from display import Display
+
+    init_display()
+    disp = Display(content=f"Score: {Random(seed).randrange(100000)}")
+
+    def run() -> None:
+        for _ in range(200):
+            disp.update_surface()
+
+    return run, 200
+
+
+def frame_setup(seed: int) -> Workload:
+    """a whole in-game frame redrawn, as after a resize"""
+    from main import App
+
+    app = App()
+    # no `start_game`, that may record the game
+    app.game = Classic2048(app.row, app.col, seed)
+    app.is_gaming = True
+    app.update_layout()
+    rng = Random(seed)
+    for _ in range(50):
+        if moves := valid_moves(app.game):
+            app.game.move(rng.choice(moves))
+
+    def run() -> None:
+        for _ in range(50):
+            app.renderer.invalidate()
+            app.update_display()
+
+    return run, 50
+
+
+def startup_setup(seed: int) -> Workload:
+    """time to the first frame of a fresh process"""
+    from startup import measure_in_subprocess
+
+    return measure_in_subprocess, 1
+
+
+BENCHMARKS: dict[str, Setup] = {
+    **{
+        f"move/{row}x{col}": move_setup(row, col)
+        for row in range(2, 7)
+        for col in range(2, 10)
+    },
+    "merge": merge_setup,
+    "is_game_over": is_game_over_setup,
+    "cal_score": cal_score_setup,
+    "draw_tile_using_config": tile_setup(cached=True),
+    "draw_tile_using_config/uncached": tile_setup(cached=False),
+    "Display.update_surface": display_setup,
+    "App.update_display": frame_setup,
+    "startup": startup_setup,
+}
+
+
+def measure(setup: Setup, seed: int, repeats: int, min_time: float) -> Result:
+    """
+    Time per operation over `repeats` runs, after a warm-up run. Each run
+    loops over the workload for at least `min_time` seconds.
+    """
+    run, ops = setup(seed)
+    start = perf_counter()
+    run()
+    loops = max(1, ceil(min_time / (perf_counter() - start)))
+
+    times = []
+    for _ in range(repeats):
+        start = perf_counter()
+        for _ in range(loops):
+            run()
+        times.append((perf_counter() - start) / (ops * loops))
+    return {"median_us": median(times) * 1e6, "min_us": min(times) * 1e6}
+
+
+def regressions(
+    results: dict[str, Result], baseline: dict[str, Result], tolerance: float
+) -> dict[str, float]:
+    """
+    Benchmarks slower than in `baseline` by more than `tolerance`, by ratio.
+    The fastest runs are compared, they are the least disturbed by whatever
+    else the machine was doing.
+    """
+    ratios = {
+        name: result["min_us"] / baseline[name]["min_us"]
+        for name, result in results.items()
+        if name in baseline
+    }
+    return {name: ratio for name, ratio in ratios.items() if ratio > 1 + tolerance}
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="bench",
+        description="Benchmark the engine, rendering and startup of Classic 2048.",
+    )
+    parser.add_argument(
+        "names", nargs="*", help="run the benchmarks whose name contains one of these"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.05,
+        help="seconds each repeat runs for at least",
+    )
+    parser.add_argument("--out", type=Path, help="write the results as JSON")
+    parser.add_argument(
+        "--baseline", type=Path, help="compare with results written by --out"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="slowdown against the baseline reported as a regression",
+    )
+    parser.add_argument("--list", action="store_true", help="list the benchmarks")
+    args = parser.parse_args(argv)
+
+    names = [
+        name
+        for name in BENCHMARKS
+        if not args.names or any(part in name for part in args.names)
+    ]
+    if args.list:
+        print("\n".join(names))
+        return
+
+    baseline: dict[str, Result] = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    results: dict[str, Result] = {}
+    width = max(map(len, names), default=0)
+    for name in names:
+        results[name] = result = measure(
+            BENCHMARKS[name], args.seed, args.repeats, args.min_time
+        )
+        line = (
+            f"{name:<{width}}  {result['min_us']:12.3f} us"
+            f"  (median {result['median_us']:.3f})"
+        )
+        if name in baseline:
+            change = result["min_us"] / baseline[name]["min_us"] - 1
+            line += f"  {change:+7.1%}"
+        print(line, flush=True)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "seed": args.seed,
+                    "repeats": args.repeats,
+                    "min_time": args.min_time,
+                    "python": platform.python_version(),
+                    "pygame": pygame.version.ver,
+                    "platform": platform.platform(),
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+
+    if slower := regressions(results, baseline, args.tolerance):
+        print(
+            f"{len(slower)} regressions over {args.tolerance:.0%}: "
+            + ", ".join(f"{name} ({ratio - 1:+.1%})" for name, ratio in slower.items())
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
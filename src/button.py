@@ -3,6 +3,7 @@ from typing import Callable, Any
 from pygame.typing import ColorLike
 
 from display import Display
+from sounds import LazySound
 
 type Params = tuple[tuple[Any, ...], dict[str, Any]]
 
@@ -30,13 +31,13 @@ class Button(Display):
         # events settings
         on_enter: Callable = lambda: None,
         on_enter_params: Params | None = None,
-        on_enter_sound: pygame.mixer.Sound | None = None,
+        on_enter_sound: pygame.mixer.Sound | LazySound | None = None,
         on_click: Callable = lambda: print("Button clicked!"),
         on_click_params: Params | None = None,
-        on_click_sound: pygame.mixer.Sound | None = None,
+        on_click_sound: pygame.mixer.Sound | LazySound | None = None,
         on_exit: Callable = lambda: None,
         on_exit_params: Params | None = None,
-        on_exit_sound: pygame.mixer.Sound | None = None,
+        on_exit_sound: pygame.mixer.Sound | LazySound | None = None,
     ):
         super().__init__(
             content,
@@ -83,7 +84,7 @@ class Button(Display):
         def handle_on_enter() -> Any:
             ret = None
 
-            if not self.is_hovered and abs_rect.collidepoint(pygame.mouse.get_pos()):
+            if not self.is_hovered and abs_rect.collidepoint(mouse_pos):
                 self.is_hovered = True
                 self.disp_color = self.disp_color_on_hover
                 if self.on_enter_sound:
@@ -122,7 +123,7 @@ class Button(Display):
         def handle_on_exit() -> Any:
             ret = None
 
-            if self.is_hovered and not abs_rect.collidepoint(pygame.mouse.get_pos()):
+            if self.is_hovered and not abs_rect.collidepoint(mouse_pos):
                 self.is_hovered = False
                 self.disp_color = self.disp_color_original
                 if self.on_exit_sound:
@@ -131,12 +132,9 @@ class Button(Display):
 
             return ret
 
-        abs_rect = self.surface.get_rect().move(
-            (
-                self.pos[0] - self.disp_size[0] / 2,
-                self.pos[1] - self.disp_size[1] / 2,
-            )
-        )
+        abs_rect = self.rect
+        # mouse events carry the pointer position, others use the current one
+        mouse_pos = getattr(event, "pos", None) or pygame.mouse.get_pos()
 
         return handle_on_enter(), handle_on_click(), handle_on_exit()
 
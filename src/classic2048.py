@@ -1,108 +1,843 @@
-from random import randint
-from typing import Literal, TypeVar
+from collections.abc import Iterator, Mapping
+from random import getrandbits
+from typing import Literal, cast
 
-T = TypeVar("T")
 type Board = list[list[int]]
+type Bitboard = int
 type Direction = Literal["left", "right", "up", "down"]
+type TileMove = tuple[int, int, bool]  # (from cell, to cell, merged), cell = i*col+j
+type MoveTrace = tuple[list[TileMove], int | None]  # (tile moves, spawned cell)
+# states before each move, newest first, as a linked list of tuples:
+# (bitboard, score, draws of the rng, direction moved, older states)
+type History = tuple[Bitboard, int, int, Direction, History] | None
+type Undone = tuple[Direction, Undone] | None  # moves to redo, newest first
+# boards after sliding towards index 0 and towards the end, and the score gained
+type SlideResult = tuple[Bitboard, Bitboard, int]
 
+DIRECTIONS: tuple[Direction, ...] = ("left", "right", "up", "down")
 
-class Classic2048:
-    def __init__(self, row: int = 4, col: int = 4):
-        self.row: int = row
-        self.col: int = col
-        self.board: Board = [[0 for _ in range(col)] for _ in range(row)]
-        self.next_boards: dict[Direction, Board] = {
-            "left": [[0 for _ in range(col)] for _ in range(row)],
-            "right": [[0 for _ in range(col)] for _ in range(row)],
-            "up": [[0 for _ in range(col)] for _ in range(row)],
-            "down": [[0 for _ in range(col)] for _ in range(row)],
+# every cell of a bitboard holds the log2 exponent of its tile (0 for empty)
+CELL_BITS = 8
+CELL_MASK = (1 << CELL_BITS) - 1
+
+MASK64 = (1 << 64) - 1
+# added to a SplitMix64 state on every draw, so `n` draws from a seed reach
+# `seed + n * GOLDEN_GAMMA` and a state can be turned back into a draw count
+GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+GOLDEN_GAMMA_INVERSE = pow(GOLDEN_GAMMA, -1, 1 << 64)
+
+
+def splitmix64(state: int) -> tuple[int, int]:
+    """
+    Advance a SplitMix64 state.
+    Returns the new state and a 64-bit draw; `BatchClassic2048` runs the same
+    generator on arrays, so seeded games are identical in both engines.
+    """
+    state = (state + GOLDEN_GAMMA) & MASK64
+    return state, mix64(state)
+
+
+def mix64(z: int) -> int:
+    """the draw of a SplitMix64 state"""
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return z ^ (z >> 31)
+
+
+def spawn_from_draw(draw: int, empty_count: int) -> tuple[int, int]:
+    """map a draw to (index among the empty cells, exponent of the new tile)"""
+    return ((draw >> 32) * empty_count) >> 32, 2 if draw & 1 else 1
+
+
+class SpawnRNG:
+    """
+    Seedable SplitMix64 stream for tile spawns.
+    The whole state is one int, so saving and restoring it is free.
+    """
+
+    __slots__ = ("seed", "state")
+
+    def __init__(self, seed: int | None = None):
+        self.seed: int = (seed if seed is not None else getrandbits(64)) & MASK64
+        self.state: int = self.seed
+
+    def next(self) -> int:
+        self.state, draw = splitmix64(self.state)
+        return draw
+
+    def getstate(self) -> int:
+        return self.state
+
+    def setstate(self, state: int) -> None:
+        self.state = state
+
+    def spawn(self, stream: int) -> "SpawnRNG":
+        """
+        Return an independent stream for e.g. a worker or a game,
+        determined only by this seed and `stream`.
+        """
+        return SpawnRNG(splitmix64(splitmix64(self.seed)[1] ^ stream)[1])
+
+
+def tile_value(exp: int) -> int:
+    return 1 << exp if exp else 0
+
+
+def tile_exp(num: int) -> int:
+    return num.bit_length() - 1 if num else 0
+
+
+def tile_score(exp: int) -> int:
+    """score of a single tile, same as `int(num / 4) ** 2`"""
+    return ((1 << exp) >> 2) ** 2 if exp else 0
+
+
+def pack_row(exps: tuple[int, ...] | list[int]) -> int:
+    key = 0
+    for i, exp in enumerate(exps):
+        key |= exp << (i * CELL_BITS)
+    return key
+
+
+def unpack_row(key: int, length: int) -> list[int]:
+    return [(key >> (i * CELL_BITS)) & CELL_MASK for i in range(length)]
+
+
+def merge(exps: list[int] | tuple[int, ...]) -> tuple[list[int], int]:
+    """
+    Slide and merge a row of tile exponents towards index 0.
+    Returns the merged row and the score gained by the merges.
+    """
+    res = []
+    score = 0
+
+    tmp = 0
+    for exp in exps:
+        if exp != 0:
+            if tmp == 0:
+                tmp = exp
+            else:
+                if exp == tmp:
+                    res.append(tmp + 1)
+                    score += tile_score(tmp + 1) - 2 * tile_score(tmp)
+                    tmp = 0
+                else:
+                    res.append(tmp)
+                    tmp = exp
+    if tmp != 0:
+        res.append(tmp)
+
+    return res + [0] * (len(exps) - len(res)), score
+
+
+def merge_trace(exps: list[int]) -> list[TileMove]:
+    """
+    Like `merge`, but returns where every tile of the row went instead:
+    (from index, to index, merged) for each non-empty cell, merged being
+    True for both tiles of a merge.
+    """
+    moves: list[TileMove] = []
+    dst = 0
+    pending: tuple[int, int] | None = None  # (index, exp) of an unmatched tile
+    for src, exp in enumerate(exps):
+        if exp == 0:
+            continue
+        if pending is None:
+            pending = (src, exp)
+        elif pending[1] == exp:
+            moves += [(pending[0], dst, True), (src, dst, True)]
+            dst += 1
+            pending = None
+        else:
+            moves.append((pending[0], dst, False))
+            dst += 1
+            pending = (src, exp)
+    if pending is not None:
+        moves.append((pending[0], dst, False))
+    return moves
+
+
+class RowTable(dict[int, tuple[int, int, int]]):
+    """
+    Maps a line of `length` cells, placed `stride` cells apart as in the
+    bitboard (1 for a row, the board width for a column), to its (result
+    towards index 0, result towards the end, score gained), placed the same
+    way. Lines are merged on first use and memoized, so only the lines games
+    actually reach are ever computed. The table is cleared once it holds
+    `max_size` lines, which keeps it to a few MB however long games run.
+    """
+
+    def __init__(self, length: int, stride: int = 1, max_size: int = 1 << 14):
+        super().__init__()
+        self.length = length
+        self.stride = stride
+        self.max_size = max_size
+
+    def __missing__(self, key: int) -> tuple[int, int, int]:
+        length, stride = self.length, self.stride
+        step = stride * CELL_BITS
+        # the tiles of the line in order, empty cells do not change a merge
+        tiles = [
+            exp for exp in key.to_bytes(length * stride, "little")[::stride] if exp
+        ]
+        count = len(tiles)
+
+        # like `merge` both ways, on the tiles only
+        towards_start = score = 0
+        i, shift = 0, 0
+        while i < count:
+            exp = tiles[i]
+            if i + 1 < count and tiles[i + 1] == exp:
+                exp += 1
+                score += tile_score(exp) - 2 * tile_score(exp - 1)
+                i += 2
+            else:
+                i += 1
+            towards_start |= exp << shift
+            shift += step
+        # runs of equal tiles merge the same number of pairs either way
+        towards_end = 0
+        i, shift = count - 1, (length - 1) * step
+        while i >= 0:
+            exp = tiles[i]
+            if i > 0 and tiles[i - 1] == exp:
+                exp += 1
+                i -= 2
+            else:
+                i -= 1
+            towards_end |= exp << shift
+            shift -= step
+
+        entry = (towards_start, towards_end, score)
+        if len(self) >= self.max_size:
+            self.clear()
+        self[key] = entry
+        return entry
+
+
+ROW_TABLES: dict[tuple[int, int], RowTable] = {}
+
+
+def row_table(length: int, stride: int = 1) -> RowTable:
+    if (length, stride) not in ROW_TABLES:
+        ROW_TABLES[length, stride] = RowTable(length, stride)
+    return ROW_TABLES[length, stride]
+
+
+class LineTable(dict[int, SlideResult]):
+    """
+    The `RowTable` of all rows or all columns of a board size, keyed by each
+    line where it sits in the bitboard and giving results placed there too,
+    so a board is slid without shifting any line. Entries are moved into
+    place from `lines` on first use and memoized, cleared like `RowTable`.
+    """
+
+    def __init__(self, lines: RowTable, starts: list[int], max_size: int = 1 << 13):
+        """`starts[cell]` is the bit the line of `cell` starts at"""
+        super().__init__()
+        self.lines = lines
+        self.starts = starts
+        self.max_size = max_size
+
+    def __missing__(self, key: int) -> SlideResult:
+        # the lowest tile tells which line this is, an empty one slides nowhere
+        shift = self.starts[((key & -key).bit_length() - 1) // CELL_BITS] if key else 0
+        towards_start, towards_end, score = self.lines[key >> shift]
+        entry = (towards_start << shift, towards_end << shift, score)
+        if len(self) >= self.max_size:
+            self.clear()
+        self[key] = entry
+        return entry
+
+
+class Layout:
+    """bit masks, shifts and tables of a board size, shared by its games"""
+
+    __slots__ = (
+        "row",
+        "col",
+        "cells",
+        "row_mask",
+        "row_shifts",
+        "row_lines",
+        "col_lines",
+        "high_bits",
+        "low_bits",
+        "last_col",
+        "row_table",
+        "col_table",
+        "slides",
+    )
+
+    def __init__(self, row: int, col: int):
+        self.row = row
+        self.col = col
+        self.cells = row * col
+        self.row_mask = (1 << (col * CELL_BITS)) - 1
+        self.row_shifts = [i * col * CELL_BITS for i in range(row)]
+        # the cells of every row and of every column, in place
+        self.row_lines = [self.row_mask << shift for shift in self.row_shifts]
+        first_col = pack_row(
+            [CELL_MASK * (j == 0) for _ in range(row) for j in range(col)]
+        )
+        self.col_lines = [first_col << (j * CELL_BITS) for j in range(col)]
+        # high bit of every cell, and the low bits below it
+        self.high_bits = pack_row([1 << (CELL_BITS - 1)] * (row * col))
+        self.low_bits = self.high_bits - pack_row([1] * (row * col))
+        # 1 in the cells of the last column
+        self.last_col = pack_row([j == col - 1 for _ in range(row) for j in range(col)])
+        cells = range(row * col)
+        self.row_table = LineTable(
+            row_table(col), [(c - c % col) * CELL_BITS for c in cells]
+        )
+        self.col_table = LineTable(
+            row_table(row, col), [(c % col) * CELL_BITS for c in cells]
+        )
+        # (table, lines, which result of an entry) of each direction, see `move`
+        self.slides: dict[Direction, tuple[LineTable, list[int], int]] = {
+            "left": (self.row_table, self.row_lines, 0),
+            "right": (self.row_table, self.row_lines, 1),
+            "up": (self.col_table, self.col_lines, 0),
+            "down": (self.col_table, self.col_lines, 1),
         }
 
+
+LAYOUTS: dict[tuple[int, int], Layout] = {}
+
+
+def layout(row: int, col: int) -> Layout:
+    if (row, col) not in LAYOUTS:
+        LAYOUTS[row, col] = Layout(row, col)
+    return LAYOUTS[row, col]
+
+
+class NextBitboards(Mapping[Direction, Bitboard]):
+    """
+    Lazy view of the boards reachable by each move, see `Classic2048.slide_memo`.
+    Opposite directions share one pass, so they are memoized together.
+    """
+
+    __slots__ = ("game",)
+
+    def __init__(self, game: "Classic2048"):
+        self.game = game
+
+    def __getitem__(self, direction: Direction) -> Bitboard:
+        return self.game.slide_memo(direction)[0]
+
+    def get_with_score(self, direction: Direction) -> tuple[Bitboard, int]:
+        """return the board after moving to `direction` and the score gained"""
+        return self.game.slide_memo(direction)
+
+    def __iter__(self) -> Iterator[Direction]:
+        return iter(DIRECTIONS)
+
+    def __len__(self) -> int:
+        return len(DIRECTIONS)
+
+
+class NextBoards(Mapping[Direction, Board]):
+    """`NextBitboards` decoded to lists on access"""
+
+    __slots__ = ("game",)
+
+    def __init__(self, game: "Classic2048"):
+        self.game = game
+
+    def __getitem__(self, direction: Direction) -> Board:
+        return self.game.decode(self.game.slide_memo(direction)[0])
+
+    def __iter__(self) -> Iterator[Direction]:
+        return iter(DIRECTIONS)
+
+    def __len__(self) -> int:
+        return len(DIRECTIONS)
+
+
+class Classic2048:
+    """
+    The board is a single int, see `Bitboard`, and everything derived from
+    its size is shared through `Layout`. The spawn generator is kept as two
+    ints and the next boards only while asked for, so a game costs less
+    than a tenth of what its boards take as lists.
+    """
+
+    __slots__ = (
+        "seed",
+        "draws",
+        "bitboard",
+        "memo",
+        "score",
+        "game_over",
+        "last_bitboard",
+        "last_direction",
+        "last_spawn",
+        "keep_history",
+        "history",
+        "undone",
+        "layout",
+    )
+
+    def __init__(
+        self,
+        row: int = 4,
+        col: int = 4,
+        seed: int | None = None,
+        rng: SpawnRNG | None = None,
+        keep_history: bool = False,
+    ):
+        """
+        `rng` takes precedence over `seed`, the game starts from its state
+        and does not advance it. `keep_history` enables `undo`.
+        """
+        # an inlined `SpawnRNG`, kept as the number of draws since the seed
+        # (a small int, unlike the state, see `rng_state`)
+        if rng is not None:
+            seed = rng.seed
+        else:
+            seed = (seed if seed is not None else getrandbits(64)) & MASK64
+        self.seed: int = seed
+        self.draws: int = 0
+        if rng is not None:
+            self.rng_state = rng.state
+        self.bitboard: Bitboard = 0
+        # (board, `slide_rows` or None, `slide_cols` or None), see `slide_memo`
+        self.memo: tuple[Bitboard, SlideResult | None, SlideResult | None] | None = None
+
         self.score: int = 0
         self.game_over: bool = False
 
+        # what the last move did, see `move_trace`
+        self.last_bitboard: Bitboard | None = None  # before the move
+        self.last_direction: Direction | None = None
+        self.last_spawn: int | None = None  # cell
+
+        # see `undo` and `redo`
+        self.keep_history: bool = keep_history
+        self.history: History = None
+        self.undone: Undone = None
+
+        self.layout = layout(row, col)
+
         self.generate_tile_and_update_next_boards()
 
-    def generate_tile_and_update_next_boards(self) -> None:
-        # helper functions
-        def get_trans_board(board: Board, direction: Direction) -> Board:
-            return {
-                "left": lambda: [[n for n in row] for row in board],
-                "right": lambda: [[n for n in row[::-1]] for row in board][::-1],
-                "up": lambda: [[n for n in row] for row in zip(*board)],
-                "down": lambda: [[n for n in row[::-1]] for row in zip(*board)][::-1],
-            }[direction]()
-
-        def merge(arr: list[int]) -> list[int]:
-            res = []
-
-            tmp = 0
-            for num in arr:
-                if num != 0:
-                    if tmp == 0:
-                        tmp = num
-                    else:
-                        if num == tmp:
-                            res.append(tmp * 2)
-                            tmp = 0
-                        else:
-                            res.append(tmp)
-                            tmp = num
-            if tmp != 0:
-                res.append(tmp)
-
-            return res + [0] * (len(arr) - len(res))
-
-        def get_random_item(lst: list[T]) -> T | None:
-            return lst[randint(0, len(lst) - 1)] if lst else None
-
-        # generate tile
-        random_empty_cell = get_random_item(
+    @property
+    def row(self) -> int:
+        return self.layout.row
+
+    @property
+    def col(self) -> int:
+        return self.layout.col
+
+    @property
+    def rng_state(self) -> int:
+        """state of the `SpawnRNG` the spawns are drawn from"""
+        return (self.seed + self.draws * GOLDEN_GAMMA) & MASK64
+
+    @rng_state.setter
+    def rng_state(self, state: int) -> None:
+        self.draws = ((state - self.seed) * GOLDEN_GAMMA_INVERSE) & MASK64
+
+    @property
+    def last_move(self) -> tuple[Bitboard, Direction] | None:
+        """(board before, direction) of the last move, None after `undo`"""
+        if self.last_direction is None:
+            return None
+        return cast(Bitboard, self.last_bitboard), self.last_direction
+
+    @property
+    def next_bitboards(self) -> NextBitboards:
+        return NextBitboards(self)
+
+    @property
+    def board(self) -> Board:
+        """the tile values as lists, decoded on every access"""
+        return self.decode(self.bitboard)
+
+    @property
+    def next_boards(self) -> NextBoards:
+        return NextBoards(self)
+
+    def slide_memo(self, direction: Direction) -> tuple[Bitboard, int]:
+        """
+        `slide` of the current board, memoized until the board changes.
+        The memo is only created when asked for and dropped by `move`.
+        """
+        bitboard = self.bitboard
+        memo = self.memo
+        if memo is None or memo[0] != bitboard:
+            memo = self.memo = (bitboard, None, None)
+
+        match direction:
+            case "left" | "right":
+                if (rows := memo[1]) is None:
+                    rows = self.slide_rows(bitboard)
+                    self.memo = (bitboard, rows, memo[2])
+                left, right, score = rows
+                return (left if direction == "left" else right), score
+            case "up" | "down":
+                if (cols := memo[2]) is None:
+                    cols = self.slide_cols(bitboard)
+                    self.memo = (bitboard, memo[1], cols)
+                up, down, score = cols
+                return (up if direction == "up" else down), score
+            case _:
+                raise KeyError(direction)
+
+    def decode(self, bitboard: Bitboard) -> Board:
+        return [
             [
-                (i, j)
-                for i in range(self.row)
+                tile_value((bitboard >> ((i * self.col + j) * CELL_BITS)) & CELL_MASK)
                 for j in range(self.col)
-                if self.board[i][j] == 0
             ]
-        )
-        if random_empty_cell:
-            i, j = random_empty_cell
-            self.board[i][j] = 2 if randint(0, 1) else 4
+            for i in range(self.row)
+        ]
+
+    def encode(self, board: Board) -> Bitboard:
+        return pack_row([tile_exp(num) for row in board for num in row])
 
-        # update next boards
-        for direction in ("left", "right", "up", "down"):
-            trans_board = get_trans_board(self.board, direction)
-            for i, row in enumerate(trans_board):
-                trans_board[i] = merge(row)
-            self.next_boards[direction] = get_trans_board(trans_board, direction)
+    def transpose(self, bitboard: Bitboard) -> Bitboard:
+        """every row of the transposed board is a column of the original one"""
+        col = self.layout.col
+        cells = bitboard.to_bytes(self.layout.cells, "little")  # a byte per cell
+        return int.from_bytes(b"".join(cells[j::col] for j in range(col)), "little")
+
+    def lines(self, bitboard: Bitboard) -> list[int]:
+        """packed rows followed by packed columns, each starting from index 0"""
+        layout = self.layout
+        col = layout.col
+        cells = bitboard.to_bytes(layout.cells, "little")
+        return [
+            (bitboard >> shift) & layout.row_mask for shift in layout.row_shifts
+        ] + [int.from_bytes(cells[j::col], "little") for j in range(col)]
+
+    def slide_rows(self, bitboard: Bitboard) -> SlideResult:
+        """return the boards after sliding left and right, and the score gained"""
+        table = self.layout.row_table
+        left = right = score = 0
+        for line in self.layout.row_lines:
+            l, r, s = table[bitboard & line]
+            left |= l
+            right |= r
+            score += s
+        return left, right, score
+
+    def slide_cols(self, bitboard: Bitboard) -> SlideResult:
+        """return the boards after sliding up and down, and the score gained"""
+        table = self.layout.col_table
+        up = down = score = 0
+        for line in self.layout.col_lines:
+            u, d, s = table[bitboard & line]
+            up |= u
+            down |= d
+            score += s
+        return up, down, score
+
+    def slide(self, bitboard: Bitboard, direction: Direction) -> tuple[Bitboard, int]:
+        """return the board after sliding to `direction` and the score gained"""
+        match direction:
+            case "left":
+                left, _, score = self.slide_rows(bitboard)
+                return left, score
+            case "right":
+                _, right, score = self.slide_rows(bitboard)
+                return right, score
+            case "up":
+                up, _, score = self.slide_cols(bitboard)
+                return up, score
+            case "down":
+                _, down, score = self.slide_cols(bitboard)
+                return down, score
+
+    def empty_cells(self, bitboard: Bitboard | None = None) -> int:
+        """mask with the high bit of every empty cell set, row-major from bit 0"""
+        bitboard = self.bitboard if bitboard is None else bitboard
+        low_bits, high_bits = self.layout.low_bits, self.layout.high_bits
+        occupied = (((bitboard & low_bits) + low_bits) | bitboard) & high_bits
+        return occupied ^ high_bits
+
+    def generate_tile_and_update_next_boards(self) -> None:
+        """spawn a tile and update `game_over`, see `move`"""
+        # generate tile, `mix64` and `spawn_from_draw` inlined
+        bitboard, size = self.bitboard, self.layout.cells
+        cells = bitboard.to_bytes(size, "little")  # a byte per cell
+        count = cells.count(0)
+        if count:
+            self.draws = draws = self.draws + 1
+            z = (self.seed + draws * GOLDEN_GAMMA) & MASK64
+            z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+            z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+            draw = z ^ (z >> 31)
+            # the cell before what follows the index-th empty one
+            index = ((draw >> 32) * count) >> 32
+            cell = size - len(cells.split(b"\0", index + 1)[-1]) - 1
+            if draw & 1:
+                self.bitboard = bitboard | 2 << (cell * CELL_BITS)
+                self.score += 1  # `tile_score` of a 4, a 2 scores nothing
+            else:
+                self.bitboard = bitboard | 1 << (cell * CELL_BITS)
+            self.last_spawn = cell
+        else:
+            self.last_spawn = None
+
+        # a cell left empty is a move left
+        self.game_over = count <= 1 and self.is_game_over()
+        # next boards are computed on demand by `self.next_bitboards`
 
     def move(self, direction: Direction) -> bool:
         """return True if move successfully, False otherwise"""
-        if not self.game_over and self.board != self.next_boards[direction]:
-            self.board = [[num for num in row] for row in self.next_boards[direction]]
-            self.generate_tile_and_update_next_boards()
-            self.score = self.cal_score()
-            self.game_over = self.is_game_over()
-            return True
-        return False
+        if self.game_over:
+            return False
+        bitboard = self.bitboard
+        if self.memo is None:  # nothing asked for, only this direction is slid
+            table, lines, side = self.layout.slides[direction]
+            next_bitboard = score = 0
+            for line in lines:
+                entry = table[bitboard & line]
+                next_bitboard |= entry[side]
+                score += entry[2]
+        else:
+            next_bitboard, score = self.slide_memo(direction)
+        if bitboard == next_bitboard:
+            return False
+
+        if self.keep_history:
+            self.history = (bitboard, self.score, self.draws, direction, self.history)
+            self.undone = None
+        self.last_bitboard = bitboard
+        self.last_direction = direction
+        self.bitboard = next_bitboard
+        self.memo = None  # until asked for again
+        self.score += score
+        self.generate_tile_and_update_next_boards()
+        return True
+
+    def undo(self) -> bool:
+        """
+        Go back to the state before the last move, False if there is none
+        or the game does not `keep_history`.
+        The board, score and rng state are only referenced, not copied,
+        so every move in the history costs the same few bytes.
+        """
+        if self.history is None:
+            return False
+        self.bitboard, self.score, self.draws, direction, self.history = self.history
+        self.undone = (direction, self.undone)
+        self.game_over = False  # it moved from here
+        self.last_bitboard = self.last_direction = None
+        self.last_spawn = None
+        return True
+
+    def redo(self) -> bool:
+        """
+        Make the last undone move again, False if there is none.
+        The rng state was restored by `undo`, so the same tile spawns again.
+        """
+        if self.undone is None:
+            return False
+        direction, undone = self.undone
+        self.move(direction)
+        self.undone = undone
+        return True
+
+    def move_trace(self) -> MoveTrace:
+        """
+        Where every tile went in the last successful move, and the cell the new
+        tile spawned in. Only computed when asked for, e.g. to animate a move.
+        """
+        if self.last_direction is None:
+            return [], self.last_spawn
+        bitboard, direction = cast(Bitboard, self.last_bitboard), self.last_direction
+
+        # cells of every line, in the order they slide in
+        cells = [[i * self.col + j for j in range(self.col)] for i in range(self.row)]
+        lines = cells if direction in ("left", "right") else list(zip(*cells))
+        if direction in ("right", "down"):
+            lines = [line[::-1] for line in lines]
+
+        moves: list[TileMove] = []
+        for line in lines:
+            exps = [(bitboard >> (cell * CELL_BITS)) & CELL_MASK for cell in line]
+            moves += [
+                (line[src], line[dst], merged) for src, dst, merged in merge_trace(exps)
+            ]
+        return moves, self.last_spawn
+
+    def max_tile(self) -> int:
+        return tile_value(max(unpack_row(self.bitboard, self.row * self.col)))
 
     def cal_score(self) -> int:
-        return sum(int(num / 4) ** 2 for row in self.board for num in row)
+        """rescan the whole board, `self.score` is kept equal to this by `move`"""
+        score = 0
+        bitboard = self.bitboard
+        while bitboard:
+            score += tile_score(bitboard & CELL_MASK)
+            bitboard >>= CELL_BITS
+        return score
 
     def is_game_over(self) -> bool:
-        return all(board == self.board for board in self.next_boards.values())
+        """
+        No move changes the board, i.e. it is full and no two neighbours are
+        equal. Checked on every cell at once without sliding, so the next
+        boards are only computed if a policy asks for them.
+        """
+        bitboard, layout = self.bitboard, self.layout
+        size = layout.cells
+        if 0 in bitboard.to_bytes(size, "little"):  # a zero byte is an empty cell
+            return False
+        # a cell equal to its right / lower neighbour xors to 0, the last
+        # column has no right neighbour and the last row xors with nothing
+        right = (bitboard ^ (bitboard >> CELL_BITS)) | layout.last_col
+        below = bitboard ^ (bitboard >> (self.col * CELL_BITS))
+        neighbours = right.to_bytes(size, "little") + below.to_bytes(size, "little")
+        return 0 not in neighbours
 
 
 if __name__ == "__main__":
+    import sys
+
+    # python -m classic2048 simulate [options]
+    if sys.argv[1:2] == ["simulate"]:
+        sys.modules["classic2048"] = sys.modules[__name__]  # don't import twice
+        from simulate import main
+
+        main(sys.argv[2:])
+        sys.exit()
+
     from pprint import pprint
+    from random import Random
 
     game = Classic2048()
-    for direction in ("left", "right", "up", "down"):
+    for direction in DIRECTIONS:
         pprint(game.board)
         pprint(direction)
         game.move(direction)
         pprint(game.board)
-        pprint(game.next_boards)
+        pprint(dict(game.next_boards))
         pprint(game.score)
         pprint(game.game_over)
         pprint("-" * 20)
+
+    # the incremental score must match a full rescan
+    for seed in range(100):
+        seed_rng = Random(seed)
+        game = Classic2048(seed_rng.randint(2, 6), seed_rng.randint(2, 9), seed)
+        while not game.game_over:
+            game.move(seed_rng.choice(DIRECTIONS))
+            assert game.score == game.cal_score()
+            assert game.game_over == all(
+                game.next_bitboards[d] == game.bitboard for d in DIRECTIONS
+            )
+    print("score check passed")
+
+    # restoring the rng state replays the same spawns
+    game = Classic2048(4, 4, seed=2048)
+    saved = (game.bitboard, game.score, game.game_over, game.rng_state)
+    replays = []
+    for _ in range(2):
+        game.bitboard, game.score, game.game_over, game.rng_state = saved
+        for direction in DIRECTIONS * 50:
+            game.move(direction)
+        replays.append((game.bitboard, game.score))
+    assert replays[0] == replays[1]
+    # the inlined generator draws like a `SpawnRNG`
+    rng = SpawnRNG(2048)
+    rng.next()
+    assert Classic2048(4, 4, seed=2048).rng_state == rng.state
+    assert Classic2048(4, 4, rng=rng).draws == 2
+    print("replay check passed")
+
+    # replaying the trace on the old board gives the new one
+    for seed in range(20):
+        seed_rng = Random(seed)
+        game = Classic2048(seed_rng.randint(2, 6), seed_rng.randint(2, 9), seed)
+        while not game.game_over:
+            if not game.move(seed_rng.choice(DIRECTIONS)):
+                continue
+            assert game.last_move is not None
+            before = game.decode(game.last_move[0])
+            after = [[0] * game.col for _ in range(game.row)]
+            moves, spawn = game.move_trace()
+            for src, dst, _ in moves:
+                i, j = divmod(dst, game.col)
+                k, l = divmod(src, game.col)
+                after[i][j] += before[k][l]
+            if spawn is not None:
+                i, j = divmod(spawn, game.col)
+                after[i][j] = game.board[i][j]
+            assert after == game.board
+    print("trace check passed")
+
+    # undoing and redoing every move gives back the same games
+    for seed in range(20):
+        seed_rng = Random(seed)
+        row, col = seed_rng.randint(2, 6), seed_rng.randint(2, 9)
+        game = Classic2048(row, col, seed, keep_history=True)
+        states = [(game.bitboard, game.score)]
+        while not game.game_over:
+            if game.move(seed_rng.choice(DIRECTIONS)):
+                states.append((game.bitboard, game.score))
+        while game.undo():
+            states.pop()
+            assert (game.bitboard, game.score) == states[-1]
+        assert len(states) == 1
+        while game.redo():
+            states.append((game.bitboard, game.score))
+        assert game.game_over and game.undone is None
+    print("undo check passed")
+
+    # memory per history step on the largest board
+    import tracemalloc
+
+    game = Classic2048(6, 9, seed=0, keep_history=True)
+    policy = Random(0)
+    tracemalloc.start()
+    moves = 0
+    while moves < 20000:
+        if game.game_over:
+            game.undo()  # keep going from before the end
+        if game.move(policy.choice(DIRECTIONS)):
+            moves += 1
+    steps = 0
+    history = game.history
+    while history is not None:
+        history = history[-1]
+        steps += 1
+    # the move tables grow too, count only what dropping the history frees
+    size = tracemalloc.get_traced_memory()[0]
+    game.history = history
+    size -= tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{steps} history steps, {size / steps:.0f} bytes/step on 6x9")
+
+    # memory per game state, against the same boards as lists of lists:
+    # the board and the four next boards, as the engine used to keep them
+    import gc
+
+    for row, col in ((4, 4), (6, 9)):
+        count = 10000
+        tracemalloc.start()
+        states = [Classic2048(row, col, seed) for seed in range(count)]
+        for game in states:
+            for direction in DIRECTIONS:
+                game.move(direction)
+        size = tracemalloc.get_traced_memory()[0]
+        lists = [[game.board, *game.next_boards.values()] for game in states]
+        list_size = tracemalloc.get_traced_memory()[0] - size
+        tracemalloc.stop()
+        print(
+            f"{row}x{col}: {size / count:.0f} bytes/game, "
+            f"{list_size / count:.0f} bytes/game for its boards as lists"
+        )
+        assert size * 10 <= list_size
+        del states, lists
+
+        # no reference cycles, dropped games are freed without the cyclic GC
+        gc.collect()
+        gc.disable()
+        states = [Classic2048(row, col, seed) for seed in range(count)]
+        for game in states:
+            dict(game.next_bitboards)
+        del states, game
+        assert gc.collect() == 0
+        gc.enable()
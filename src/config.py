@@ -3,7 +3,13 @@ WINDOW_SIZE = {
     "height": 640,
 }
 
+# tiles are scaled to fit the window, these are their default size and the
+# space kept free around the board, at the window size above
 TILE_SIZE = 100
+BOARD_MARGIN = {
+    "width": 60,
+    "height": 40,
+}
 
 TILE_COLOR = {
     0: (192, 192, 192),
@@ -38,3 +44,31 @@ FONT_COLOR = {
 }
 
 BG_COLOR = (51, 51, 51)
+
+# frame rate cap while something is moving, idle frames wait for events
+FPS = 144
+
+# held keys repeat after (delay, interval) in milliseconds, (0, 0) disables it
+KEY_REPEAT = (200, 50)
+
+# tile slide after a move in seconds, advanced at a fixed rate per second
+SLIDE_TIME = 0.1
+SLIDE_UPDATE_RATE = 60
+
+# autoplay search depth and time per move in seconds
+AI_DEPTH = 4
+AI_TIME_BUDGET = 0.05
+# hints are searched in the background, so they can take longer
+HINT_TIME_BUDGET = 0.5
+
+# when on, every game played is appended to this file in the data directory
+# (see base_path.py and record.py) until it grows past the size in bytes
+RECORD_GAMES = False
+RECORD_FILE = "games.rec"
+RECORD_MAX_SIZE = 64 * 2**20
+
+# the performance overlay (F3, when run from source) is saved here when hidden
+PROFILE_FILE = "profile.json"
+
+# time to the first frame in seconds, `python startup.py` fails above it
+STARTUP_BUDGET = 0.5
@@ -1,10 +1,36 @@
 import pygame
+from typing import Any
 from pygame.typing import ColorLike
 
 from font import font
 
+# attributes the surface is rendered from, setting one marks it dirty
+SURFACE_ATTRS = frozenset(
+    {
+        "content",
+        "font_size",
+        "font_color",
+        "offset_y",
+        "disp_size",
+        "disp_color",
+        "outline_thickness",
+        "outline_color",
+        "alpha",
+    }
+)
+
 
 class Display:
+    """
+    Text or image on a filled rectangle. The surface is only re-rendered
+    when an attribute in `SURFACE_ATTRS` changes to a different value.
+    """
+
+    # surfaces rendered by all displays and buttons, for profiling
+    total_rebuilds: int = 0
+    # bumped whenever any display or button may have moved, see `rect`
+    geometry_changes: int = 0
+
     def __init__(
         self,
         # basic settings
@@ -34,7 +60,25 @@ class Display:
         self.outline_color = outline_color
         self.alpha = alpha
 
-        self.update_surface()
+        # rendered when first shown
+        self._surface: pygame.Surface | None = None
+        self.rebuilds: int = 0
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in SURFACE_ATTRS and self.__dict__.get(name, None) != value:
+            self.__dict__["is_dirty"] = True
+        if name in ("pos", "disp_size") and self.__dict__.get(name, None) != value:
+            self.__dict__["_rect"] = None
+            Display.geometry_changes += 1
+        super().__setattr__(name, value)
+
+    @property
+    def surface(self) -> pygame.Surface:
+        """rendered display, re-rendered first if it is out of date"""
+        if self.is_dirty or self._surface is None:
+            self.update_surface()
+        assert self._surface is not None
+        return self._surface
 
     def update_surface(self) -> None:
         surface = pygame.Surface(self.disp_size)
@@ -69,17 +113,36 @@ class Display:
             )
 
         surface.set_alpha(self.alpha)
-        self.surface = surface
+        self._surface = surface
+        self.is_dirty = False
+        self.rebuilds += 1
+        Display.total_rebuilds += 1
+
+    @property
+    def topleft(self) -> tuple[float, float]:
+        return (
+            self.pos[0] - self.disp_size[0] / 2,
+            self.pos[1] - self.disp_size[1] / 2,
+        )
+
+    @property
+    def rect(self) -> pygame.Rect:
+        """
+        Area covered on the screen, cached until `pos` or `disp_size` changes.
+        The same object is returned until then, so it can be compared by `is`.
+        """
+        if self._rect is None:
+            self._rect = pygame.Rect(self.topleft, self.disp_size)
+        return self._rect
 
     def draw(self, screen: pygame.Surface, update_before_draw: bool = True) -> None:
-        if update_before_draw:
-            self.update_surface()
+        """
+        Blit the surface centered at `pos`, re-rendering it first only if it is
+        out of date. Without `update_before_draw`, the last render (if any) is used.
+        """
         screen.blit(
-            self.surface,
-            (
-                self.pos[0] - self.disp_size[0] / 2,
-                self.pos[1] - self.disp_size[1] / 2,
-            ),
+            self._surface if self._surface and not update_before_draw else self.surface,
+            self.topleft,
         )
 
 
@@ -91,9 +154,18 @@ if __name__ == "__main__":
     screen = pygame.display.set_mode((1920, 1080))
     screen.fill(config.BG_COLOR)
 
-    Display(
+    disp = Display(
         content=pygame.image.load(base_path / "assets" / "icon" / "2048.ico"), alpha=128
-    ).draw(screen)
+    )
+    disp.draw(screen)
+
+    # unchanged or re-assigned to the same value: no new render
+    disp.alpha = 128
+    disp.draw(screen)
+    assert disp.rebuilds == 1
+    disp.alpha = 255
+    disp.draw(screen)
+    assert disp.rebuilds == 2
 
     pygame.display.flip()
 
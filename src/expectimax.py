@@ -0,0 +1,260 @@
+from collections import Counter
+from time import perf_counter
+
+from classic2048 import (
+    CELL_BITS,
+    DIRECTIONS,
+    Bitboard,
+    Classic2048,
+    Direction,
+    unpack_row,
+)
+
+# line heuristic weights, larger boards simply sum more lines
+LOST_PENALTY = 200000.0
+EMPTY_WEIGHT = 270.0
+MERGES_WEIGHT = 700.0
+MONOTONICITY_POWER = 4.0
+MONOTONICITY_WEIGHT = 47.0
+SUM_POWER = 3.5
+SUM_WEIGHT = 11.0
+
+
+def line_heuristic(exps: list[int]) -> float:
+    """
+    Value of one row or column of tile exponents: rewards empty cells and
+    possible merges, punishes non-monotonic lines and big tiles in the middle.
+    """
+    empty = merges = 0
+    prev = counter = 0
+    for exp in exps:
+        if exp == 0:
+            empty += 1
+            continue
+        if prev == exp:
+            counter += 1
+        elif counter > 0:
+            merges += 1 + counter
+            counter = 0
+        prev = exp
+    if counter > 0:
+        merges += 1 + counter
+
+    mono_left = mono_right = 0.0
+    for a, b in zip(exps, exps[1:]):
+        if a > b:
+            mono_left += a**MONOTONICITY_POWER - b**MONOTONICITY_POWER
+        else:
+            mono_right += b**MONOTONICITY_POWER - a**MONOTONICITY_POWER
+
+    return (
+        LOST_PENALTY
+        + EMPTY_WEIGHT * empty
+        + MERGES_WEIGHT * merges
+        - MONOTONICITY_WEIGHT * min(mono_left, mono_right)
+        - SUM_WEIGHT * sum(exp**SUM_POWER for exp in exps)
+    )
+
+
+class HeuristicTable(dict[int, float]):
+    """`line_heuristic` of packed lines, memoized like `RowTable`"""
+
+    def __init__(self, length: int, max_size: int = 1 << 16):
+        super().__init__()
+        self.length = length
+        self.max_size = max_size
+
+    def __missing__(self, key: int) -> float:
+        value = line_heuristic(unpack_row(key, self.length))
+        if len(self) >= self.max_size:
+            self.clear()
+        self[key] = value
+        return value
+
+
+HEURISTIC_TABLES: dict[int, HeuristicTable] = {
+    length: HeuristicTable(length) for length in range(2, 10)
+}
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class Expectimax:
+    """
+    Expectimax search over moves and tile spawns (2 or 4 with equal odds).
+    Chance nodes are memoized in a transposition table keyed by the bitboard,
+    which is cleared once it holds `table_size` entries. Spawns less likely
+    than `min_probability` are not expanded but evaluated directly.
+    With a `time_budget` (seconds), the search deepens one move at a time and
+    returns the best move of the deepest search that finished in time.
+    """
+
+    def __init__(
+        self,
+        depth: int = 3,
+        time_budget: float | None = None,
+        min_probability: float = 1e-4,
+        table_size: int = 1 << 18,
+    ):
+        self.depth = depth
+        self.time_budget = time_budget
+        self.min_probability = min_probability
+        self.table_size = table_size
+
+        self.table: dict[Bitboard, tuple[int, float]] = {}
+        # 2 moves deep, only the chance nodes after the first move are stored,
+        # each search looks them up once and no later search reaches them again
+        self.use_table = depth > 2
+
+        # statistics
+        self.nodes: int = 0
+        self.table_lookups: int = 0
+        self.table_hits: int = 0
+        self.table_clears: int = 0
+        self.searches: int = 0
+        self.search_depth: int = 0
+        self.search_time: float = 0.0
+
+        self._game: Classic2048 | None = None
+        self._geometry: tuple[int, int] | None = None
+        self._deadline: float | None = None
+
+        # set from another thread or process (see `hint`) to stop the running
+        # search early, `best_move` then returns the best move found so far
+        self.cancelled: bool = False
+
+    def best_move(self, game: Classic2048) -> Direction | None:
+        if (game.row, game.col) != self._geometry:
+            # same bitboard, different board
+            self._geometry = (game.row, game.col)
+            self.table.clear()
+        self._game = game
+        self._row_table = HEURISTIC_TABLES[game.col]
+        self._col_table = HEURISTIC_TABLES[game.row]
+
+        moves = [
+            (direction, game.next_bitboards[direction])
+            for direction in DIRECTIONS
+            if game.next_bitboards[direction] != game.bitboard
+        ]
+        if not moves:
+            return None
+
+        start = perf_counter()
+        self._deadline = start + self.time_budget if self.time_budget else None
+        best = moves[0][0]
+        for depth in range(1, self.depth + 1):
+            try:
+                best = max(
+                    moves, key=lambda move: self.chance_node(move[1], depth - 1, 1.0)
+                )[0]
+            except SearchTimeout:
+                break
+            self.search_depth += 1
+        self.searches += 1
+        self.search_time += perf_counter() - start
+        return best
+
+    def heuristic(self, bitboard: Bitboard) -> float:
+        game = self._game
+        assert game is not None
+        lines = game.lines(bitboard)
+        return sum(self._row_table[line] for line in lines[: game.row]) + sum(
+            self._col_table[line] for line in lines[game.row :]
+        )
+
+    def max_node(self, bitboard: Bitboard, depth: int, probability: float) -> float:
+        game = self._game
+        assert game is not None
+
+        self.nodes += 1
+        if self.nodes % 256 == 0:
+            if self.cancelled or (self._deadline and perf_counter() > self._deadline):
+                raise SearchTimeout
+
+        best = 0.0  # no move left
+        left, right, _ = game.slide_rows(bitboard)
+        up, down, _ = game.slide_cols(bitboard)
+        for next_bitboard in (left, right, up, down):
+            if next_bitboard != bitboard:
+                best = max(best, self.chance_node(next_bitboard, depth, probability))
+        return best
+
+    def chance_node(self, bitboard: Bitboard, depth: int, probability: float) -> float:
+        if depth == 0 or probability < self.min_probability:
+            return self.heuristic(bitboard)
+
+        if self.use_table:
+            self.table_lookups += 1
+            entry = self.table.get(bitboard)
+            if entry is not None and entry[0] >= depth:
+                self.table_hits += 1
+                return entry[1]
+
+        game = self._game
+        assert game is not None
+        empty_cells = game.empty_cells(bitboard)
+        count = empty_cells.bit_count()
+        cell_probability = probability / count * 0.5
+
+        value = 0.0
+        while empty_cells:
+            lowest = empty_cells & -empty_cells
+            shift = lowest.bit_length() - CELL_BITS
+            for exp in (1, 2):
+                value += self.max_node(
+                    bitboard | exp << shift, depth - 1, cell_probability
+                )
+            empty_cells ^= lowest
+        value /= count * 2
+
+        if self.use_table:
+            if len(self.table) >= self.table_size:
+                self.table.clear()
+                self.table_clears += 1
+            self.table[bitboard] = (depth, value)
+        return value
+
+    def counters(self) -> Counter[str]:
+        """statistics to be summed over several searchers"""
+        return Counter(
+            nodes=self.nodes,
+            table_lookups=self.table_lookups,
+            table_hits=self.table_hits,
+            table_clears=self.table_clears,
+            searches=self.searches,
+            search_depth=self.search_depth,
+            search_time=self.search_time,  # type: ignore
+        )
+
+    def stats(self) -> dict[str, float]:
+        return search_stats(self.counters())
+
+
+def search_stats(counters: Counter[str]) -> dict[str, float]:
+    """
+    nodes/s, cache hit rate and average depth from `Expectimax.counters`,
+    the hit rate only if the table was used
+    """
+    time = counters["search_time"]
+    lookups = counters["table_lookups"]
+    searches = counters["searches"]
+    return {
+        "nodes": counters["nodes"],
+        "nodes_per_sec": counters["nodes"] / time if time else 0.0,
+        **({"cache_hit_rate": counters["table_hits"] / lookups} if lookups else {}),
+        "average_depth": counters["search_depth"] / searches if searches else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    for depth, time_budget in ((2, None), (4, 0.05)):
+        ai = Expectimax(depth, time_budget)
+        game = Classic2048(seed=0)
+        for _ in range(300):
+            if (direction := ai.best_move(game)) is None:
+                break
+            game.move(direction)
+        print(f"score {game.score}, max tile {game.max_tile()}, {ai.stats()}")
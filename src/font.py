@@ -1,21 +1,39 @@
 import pygame
-import warnings
+from functools import cache, lru_cache
 
-warnings.filterwarnings("error", category=UserWarning)
+SYSTEM_FONT = "comicsansms"
 
+# fonts of different sizes kept alive at once, text and tiles use about 20
+FONT_CACHE_SIZE = 64
 
+
+@cache
+def system_font_path() -> str | None:
+    """
+    Path of `SYSTEM_FONT`, looked up once.
+    None if it is not installed, which is remembered as well.
+    """
+    return pygame.font.match_font(SYSTEM_FONT)
+
+
+@lru_cache(maxsize=FONT_CACHE_SIZE)
 def font(size: int, size_backup: int) -> tuple[pygame.font.Font, bool]:
     """
     Try to load system font "comicsansms" with given size.
     If failed, load default pygame font with given size_backup.
     True will be returned if system font loaded successfully, False otherwise.
+    Fonts are cached and shared between callers, so do not change their style.
     """
-    try:
-        return pygame.font.SysFont("comicsansms", size), True
-    except UserWarning:
-        return pygame.font.Font(None, size_backup), False
+    if (path := system_font_path()) is not None:
+        try:
+            return pygame.font.Font(path, size), True
+        except OSError:
+            pass
+    return pygame.font.Font(None, size_backup), False
 
 
 if __name__ == "__main__":
     pygame.init()
     print(font(30, 20))
+    assert font(30, 20) is font(30, 20)
+    print(system_font_path(), font.cache_info())
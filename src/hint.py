@@ -0,0 +1,225 @@
+import multiprocessing
+import os
+import threading
+from multiprocessing.connection import Connection
+from multiprocessing.synchronize import Event
+from typing import Callable
+
+from classic2048 import Bitboard, Classic2048, Direction
+from expectimax import Expectimax
+
+type BoardKey = tuple[int, int, Bitboard]  # (row, col, bitboard)
+# (board searched, its best move, statistics of the searches so far)
+type HintResult = tuple[BoardKey, Direction | None, dict[str, float]]
+
+
+class CancellableExpectimax(Expectimax):
+    """`Expectimax` whose `cancelled` flag is an event shared between processes"""
+
+    def __init__(self, depth: int, time_budget: float | None, event: Event):
+        self.event = event
+        super().__init__(depth, time_budget)
+
+    @property
+    def cancelled(self) -> bool:
+        return self.event.is_set()
+
+    @cancelled.setter
+    def cancelled(self, value: bool) -> None:
+        if value:
+            self.event.set()
+        else:
+            self.event.clear()
+
+
+def search(
+    conn: Connection, cancelled: Event, depth: int, time_budget: float | None
+) -> None:
+    """
+    Runs in the hint process: searches the newest board received on `conn`
+    and sends back a `HintResult` unless it was cancelled meanwhile.
+    None drops the boards received before it, the parent closing its end of
+    `conn` ends the process.
+    """
+    if hasattr(os, "nice"):
+        os.nice(10)  # frames of the game come first
+    ai = CancellableExpectimax(depth, time_budget, cancelled)
+    scratch: Classic2048 | None = None
+    while True:
+        try:
+            key = conn.recv()
+            while conn.poll():  # only the newest request matters
+                key = conn.recv()
+        except EOFError:
+            return
+        if key is None:
+            continue
+        ai.cancelled = False
+
+        row, col, bitboard = key
+        if scratch is None or (scratch.row, scratch.col) != (row, col):
+            scratch = Classic2048(row, col, seed=0)
+        scratch.bitboard = bitboard
+        scratch.game_over = False
+        direction = ai.best_move(scratch)
+        if not ai.cancelled:
+            try:
+                conn.send((key, direction, ai.stats()))
+            except OSError:
+                return
+
+
+class HintEngine:
+    """
+    Suggests moves with an `Expectimax` running in a separate process, so the
+    search does not hold the GIL while the game draws its frames. The process
+    is started by the first request. `request` and `hint` never wait for the
+    search: the newest request replaces any pending one, and results are
+    cached per board state. `on_ready` is called from a background thread
+    whenever a hint is cached.
+    """
+
+    def __init__(
+        self,
+        depth: int = 4,
+        time_budget: float | None = 1.0,
+        cache_size: int = 4096,
+        on_ready: Callable[[], None] | None = None,
+    ):
+        self.depth = depth
+        self.time_budget = time_budget
+        self.cache: dict[BoardKey, Direction | None] = {}
+        self.cache_size = cache_size
+        self.on_ready = on_ready
+        self.search_stats: dict[str, float] = {}  # of the hint process
+
+        # the board sent last and not answered yet
+        self._requested: BoardKey | None = None
+        self._lock = threading.Lock()
+        self._conn: Connection | None = None
+        self._cancelled: Event | None = None
+        self._process: multiprocessing.process.BaseProcess | None = None
+
+    @staticmethod
+    def key(game: Classic2048) -> BoardKey:
+        return game.row, game.col, game.bitboard
+
+    def hint(self, game: Classic2048) -> Direction | None:
+        """cached suggestion for the current board, None if not ready (yet)"""
+        return self.cache.get(self.key(game))
+
+    def is_ready(self, game: Classic2048) -> bool:
+        return self.key(game) in self.cache
+
+    def start(self) -> None:
+        # spawned rather than forked, the game process has pygame and threads
+        context = multiprocessing.get_context("spawn")
+        self._conn, child = context.Pipe()
+        self._cancelled = context.Event()
+        self._process = context.Process(
+            target=search,
+            args=(child, self._cancelled, self.depth, self.time_budget),
+            name="hint",
+            daemon=True,
+        )
+        self._process.start()
+        child.close()
+        threading.Thread(
+            target=self._receive, args=(self._conn,), name="hint", daemon=True
+        ).start()
+
+    def request(self, game: Classic2048) -> None:
+        """start searching the current board unless it is done or under way"""
+        key = self.key(game)
+        with self._lock:
+            if key in self.cache or key == self._requested:
+                return
+            if self._conn is None:
+                self.start()
+            assert self._conn is not None and self._cancelled is not None
+            if self._requested is not None:
+                self._cancelled.set()
+            self._requested = key
+            self._send(key)
+
+    def cancel(self) -> None:
+        """drop the pending request and stop the running search"""
+        with self._lock:
+            if self._requested is None:
+                return
+            assert self._conn is not None and self._cancelled is not None
+            self._requested = None
+            self._cancelled.set()
+            self._send(None)
+
+    def _send(self, key: BoardKey | None) -> None:
+        assert self._conn is not None
+        try:
+            self._conn.send(key)
+        except OSError:
+            # the hint process died, the next request starts another
+            self._conn = self._cancelled = self._process = None
+            self._requested = None
+
+    def close(self) -> None:
+        """stop the hint process, a later request starts a new one"""
+        with self._lock:
+            process, self._process = self._process, None
+            self._conn = self._cancelled = None
+            self._requested = None
+        if process is not None:
+            process.terminate()  # the receiving thread then closes the pipe
+            process.join()
+
+    def _receive(self, conn: Connection) -> None:
+        while True:
+            try:
+                result: HintResult = conn.recv()
+            except (EOFError, OSError):
+                conn.close()  # the hint process ended
+                return
+            key, direction, self.search_stats = result
+            with self._lock:
+                if len(self.cache) >= self.cache_size:
+                    self.cache.clear()
+                self.cache[key] = direction
+                if key == self._requested:
+                    self._requested = None
+            if self.on_ready:
+                self.on_ready()
+
+
+if __name__ == "__main__":
+    from statistics import median
+    from time import perf_counter, sleep
+
+    engine = HintEngine(time_budget=0.2)
+    game = Classic2048(seed=0)
+
+    # a move cancels the hint of the previous board
+    engine.request(game)
+    game.move("left")
+    engine.cancel()
+    engine.request(game)
+
+    start = perf_counter()
+    while not engine.is_ready(game):
+        sleep(0.001)  # the main loop would keep drawing frames here
+    print(f"hint {engine.hint(game)} after {perf_counter() - start:.3f}s")
+    print(engine.search_stats)
+
+    # frames of the main loop keep their pace while a search runs
+    def frame_ms() -> float:
+        start = perf_counter()
+        for _ in range(200):
+            Classic2048(6, 9, seed=0).move("left")
+        return (perf_counter() - start) * 1000
+
+    idle = median(frame_ms() for _ in range(50))
+    game = Classic2048(6, 9, seed=1)
+    engine.request(game)
+    busy = []
+    while not engine.is_ready(game):
+        busy.append(frame_ms())
+    print(f"frame {idle:.2f} ms idle, {median(busy):.2f} ms while searching")
+    engine.close()
@@ -0,0 +1,120 @@
+import json
+import warnings
+from pathlib import Path
+from typing import Literal, cast, get_args
+
+import pygame
+
+type Action = Literal[
+    "left",
+    "right",
+    "up",
+    "down",
+    "confirm",
+    "back",
+    "undo",
+    "redo",
+    "toggle_bgm",
+    "toggle_autoplay",
+    "toggle_hint",
+    "toggle_fullscreen",
+    "toggle_profiler",
+    "debug_game_over",
+]
+type Keymap = dict[int, Action]  # key code -> action
+
+ACTIONS: tuple[Action, ...] = get_args(Action.__value__)
+
+# actions repeated while their key is held, every other one fires once per press
+REPEATABLE: frozenset[Action] = frozenset(
+    {"left", "right", "up", "down", "undo", "redo"}
+)
+
+# key names as shown by `pygame.key.name`, the same names are used in the file
+DEFAULT_BINDINGS: dict[Action, tuple[str, ...]] = {
+    "left": ("left", "a", "[4]"),
+    "right": ("right", "d", "[6]"),
+    "up": ("up", "w", "[8]"),
+    "down": ("down", "s", "[2]"),
+    "confirm": ("return", "space", "[5]", "enter", "[0]"),
+    "back": ("r", "escape", "[.]"),
+    "undo": ("z", "backspace"),
+    "redo": ("y",),
+    "toggle_bgm": ("m",),
+    "toggle_autoplay": ("p",),
+    "toggle_hint": ("h",),
+    "toggle_fullscreen": ("f11",),
+    "toggle_profiler": ("f3",),
+    "debug_game_over": ("f2",),
+}
+
+
+def load_bindings(path: Path) -> dict[Action, tuple[str, ...]]:
+    """
+    Default bindings, with the actions listed in the JSON file at `path`
+    (if it exists) rebound, e.g. `{"left": ["left", "j"], "back": ["q"]}`.
+    """
+    bindings = DEFAULT_BINDINGS.copy()
+    if not path.is_file():
+        return bindings
+
+    with open(path, encoding="utf-8") as f:
+        rebound = json.load(f)
+    for action, names in rebound.items():
+        if action not in ACTIONS:
+            raise ValueError(f"{path}: unknown action {action!r}")
+        if isinstance(names, str):
+            names = [names]
+        bindings[cast(Action, action)] = tuple(names)
+    return bindings
+
+
+def build_keymap(bindings: dict[Action, tuple[str, ...]]) -> Keymap:
+    """one lookup table for all actions, a key bound twice keeps the last one"""
+    keymap: Keymap = {}
+    for action, names in bindings.items():
+        for name in names:
+            try:
+                keymap[pygame.key.key_code(name)] = action
+            except ValueError:
+                raise ValueError(
+                    f"unknown key {name!r} for action {action!r}"
+                ) from None
+    return keymap
+
+
+def load_keymap(path: Path) -> Keymap:
+    """
+    `build_keymap` of the bindings at `path`. A file that cannot be read or
+    used is reported as a warning and the default bindings are used instead.
+    """
+    try:
+        return build_keymap(load_bindings(path))
+    except (OSError, ValueError) as e:  # bad JSON is a ValueError too
+        warnings.warn(f"ignoring {path}, using the default keys: {e}")
+        return build_keymap(DEFAULT_BINDINGS)
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    pygame.init()
+    keymap = build_keymap(DEFAULT_BINDINGS)
+    assert keymap[pygame.K_KP4] == "left"
+    assert keymap[pygame.K_KP_ENTER] == "confirm"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "keymap.json"
+        path.write_text('{"left": ["j"], "toggle_hint": "?"}')
+        keymap = build_keymap(load_bindings(path))
+        assert keymap[pygame.K_j] == "left" and pygame.K_a not in keymap
+        assert keymap[pygame.K_QUESTION] == "toggle_hint"
+
+        # broken files fall back to the defaults
+        for text in ('{"left": ["nokey"]}', '{"jump": ["j"]}', "{"):
+            path.write_text(text)
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter("always")
+                assert load_keymap(path) == build_keymap(DEFAULT_BINDINGS)
+            assert len(caught) == 1
+    print(f"{len(keymap)} keys bound")
@@ -1,26 +1,62 @@
+from time import perf_counter
+
+STARTED = perf_counter()  # before the imports below, see `App.startup`
+
+import multiprocessing
 import sys
 import pygame
+from collections.abc import Callable
 from typing import Literal, cast
 
 import config
+import tile_drawer
+from animation import SlideAnimation
 from button import Button
 from display import Display
-from base_path import is_dev_env, base_path
+from base_path import is_dev_env, base_path, data_path, user_path
 from classic2048 import Classic2048, Direction
-from tile_drawer import draw_tile_using_config
+from expectimax import Expectimax
+from font import font
+from hint import HintEngine
+from keymap import REPEATABLE, load_keymap
+from profiler import Profiler
+from record import RecordWriter
+from renderer import DirtyRenderer, Layer
+from router import EventRouter
+from sounds import LazySound, preload
+from tile_drawer import clear_tile_cache, draw_tile_using_config
+from timing import StartupTimer
 
 VERSION = "1.0.3"
 AUTHOR = "Withered_Flower"
 
+# posted when a hint arrives from the hint process, wakes up the main loop
+# while it waits for events
+HINT_READY = pygame.event.custom_type()
+
+# board size changed by the direction keys in the main menu
+MENU_STEPS: dict[Direction, tuple[Literal["row", "col"], Literal[1, -1]]] = {
+    "left": ("col", -1),
+    "right": ("col", 1),
+    "up": ("row", 1),
+    "down": ("row", -1),
+}
+
 
 class App:
     def __init__(self) -> None:
+        # time to first frame, printed in development, see also startup.py
+        self.startup = StartupTimer(STARTED)
+        self.startup.lap("imports")
+
         # initialize pygame
         pygame.init()
-        self.screen = pygame.display.set_mode(
-            (config.WINDOW_SIZE["width"], config.WINDOW_SIZE["height"])
-        )
+        self.windowed_size = (config.WINDOW_SIZE["width"], config.WINDOW_SIZE["height"])
+        self.screen = pygame.display.set_mode(self.windowed_size, pygame.RESIZABLE)
+        self.is_fullscreen: bool = False
         pygame.display.set_caption("Classic 2048")
+        self.startup.lap("pygame init")
+
         pygame.display.set_icon(
             pygame.image.load(base_path / "assets" / "icon" / "2048.ico")
         )
@@ -28,24 +64,58 @@ class App:
         # disable text input
         pygame.key.stop_text_input()
 
-        # load sounds
+        # keyboard, bindings can be changed in keymap.json
+        self.keymap = load_keymap(user_path / "keymap.json")
+        self.pending_moves: list[Direction] = []
+        # every key repeats while held, see `handle_events` for which count
+        pygame.key.set_repeat(*config.KEY_REPEAT)
+        self.held_keys: set[int] = set()
+
+        # frame timing and drawing
+        self.clock = pygame.time.Clock()
+        self.needs_redraw: bool = True
+        self.renderer = DirtyRenderer(self.screen, config.BG_COLOR)
+        self.animation: SlideAnimation | None = None
+
+        # stream the bgm instead of decoding all of it up front
         sounds_path = base_path / "assets" / "sounds"
-        self.bgm = pygame.mixer.Sound(sounds_path / "bgm.ogg")
-        self.slide_sound = pygame.mixer.Sound(sounds_path / "slide.wav")
-        self.game_over_sound = pygame.mixer.Sound(sounds_path / "game_over.wav")
-        self.bgm.set_volume(0.5)
-        self.slide_sound.set_volume(0.5)
-        self.game_over_sound.set_volume(0.5)
-        self.hover_sound = pygame.mixer.Sound(sounds_path / "hover.ogg")
-        self.click_sound = pygame.mixer.Sound(sounds_path / "click.ogg")
+        pygame.mixer.music.load(sounds_path / "bgm.ogg")
+        pygame.mixer.music.set_volume(0.5)
+        pygame.mixer.music.play(-1)
 
-        self.bgm.play(-1)
+        # sound effects are loaded in the background, or when first played
+        self.slide_sound = LazySound(sounds_path / "slide.wav", 0.5)
+        self.game_over_sound = LazySound(sounds_path / "game_over.wav", 0.5)
+        self.hover_sound = LazySound(sounds_path / "hover.ogg")
+        self.click_sound = LazySound(sounds_path / "click.ogg")
+        preload(
+            [self.hover_sound, self.click_sound, self.slide_sound, self.game_over_sound]
+        )
+        self.startup.lap("assets")
 
         # game variables
         self.row: int = 4
         self.col: int = 4
         self.is_gaming: bool = False
         self.is_bgm_on: bool = True
+        self.is_autoplay: bool = False
+        self.ai = Expectimax(config.AI_DEPTH, config.AI_TIME_BUDGET)
+        self.is_hint_on: bool = False
+        self.hints = HintEngine(
+            config.AI_DEPTH,
+            config.HINT_TIME_BUDGET,
+            on_ready=lambda: pygame.event.post(pygame.event.Event(HINT_READY)),
+        )
+        self.hint_shown_for: int | None = None  # bitboard of the drawn hint
+        # games are appended to a record file if enabled, see `start_game`
+        self.is_recording: bool = config.RECORD_GAMES
+        self.recorder: RecordWriter | None = None
+
+        # performance overlay for development, see `toggle_profiler`
+        self.profiler = Profiler()
+        self.profile_overlay: pygame.Surface | None = None
+        self.profile_drawn_at: float = 0.0
+        self.instrument()
 
         # create displays
         self.mainmenu_disps: dict[str, Display] = {
@@ -168,6 +238,16 @@ class App:
                 outline_thickness=0,
                 alpha=196,
             ),
+            "hint": Display(
+                content="",
+                font_size=(30, 40),
+                font_color="white",
+                offset_y=(0, 2),
+                disp_size=(110, 44),
+                disp_color="black",
+                outline_thickness=0,
+                alpha=160,
+            ),
         }
 
         # create buttons
@@ -269,16 +349,269 @@ class App:
 
         self.game: Classic2048 | None = None
 
+        # mouse events only reach the buttons they concern
+        self.mainmenu_router = EventRouter(self.mainmenu_btns.values())
+        self.ingame_router = EventRouter(self.ingame_btns.values())
+
+        # widget geometry for the default window size, see `update_layout`
+        self.base_geometry = {
+            widget: (widget.pos, widget.font_size, widget.offset_y, widget.disp_size)
+            for widget in (
+                *self.mainmenu_disps.values(),
+                *self.ingame_disps.values(),
+                *self.mainmenu_btns.values(),
+                *self.ingame_btns.values(),
+            )
+        }
+        self.scale: float = 1.0
+        self.tile_size: int = config.TILE_SIZE
+        self.update_layout()
+        self.startup.lap("widgets")
+
     def toggle_bgm(self) -> None:
         self.is_bgm_on = not self.is_bgm_on
-        self.bgm.set_volume(0.5 if self.is_bgm_on else 0)
+        pygame.mixer.music.set_volume(0.5 if self.is_bgm_on else 0)
         self.mainmenu_btns["bgm_toggle"].font_color = (
             "white" if self.is_bgm_on else "black"
         )
 
+    def toggle_fullscreen(self) -> None:
+        self.is_fullscreen = not self.is_fullscreen
+        if self.is_fullscreen:
+            self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        else:
+            self.screen = pygame.display.set_mode(self.windowed_size, pygame.RESIZABLE)
+        self.update_layout()
+
+    def update_layout(self) -> None:
+        """
+        Fit everything to the window: widgets keep their relative positions and
+        scale with the window, tiles are as big as the board and window allow.
+        Surfaces of the new size are drawn once, when they are next shown.
+        """
+        self.screen = pygame.display.get_surface()
+        width, height = self.screen.get_size()
+        scale_x = width / config.WINDOW_SIZE["width"]
+        scale_y = height / config.WINDOW_SIZE["height"]
+        self.scale = min(scale_x, scale_y)
+
+        # helper functions
+        def scaled(size: tuple[int, int]) -> tuple[int, int]:
+            return round(size[0] * self.scale), round(size[1] * self.scale)
+
+        for widget, (pos, font_size, offset_y, disp_size) in self.base_geometry.items():
+            widget.pos = (pos[0] * scale_x, pos[1] * scale_y)
+            widget.font_size = scaled(font_size)
+            widget.offset_y = scaled(offset_y)
+            widget.disp_size = scaled(disp_size)
+
+        if self.game is not None:
+            tile_size = max(
+                1,
+                int(
+                    min(
+                        (width - config.BOARD_MARGIN["width"] * self.scale)
+                        / self.game.col,
+                        (height - config.BOARD_MARGIN["height"] * self.scale)
+                        / self.game.row,
+                    )
+                ),
+            )
+            if tile_size != self.tile_size:
+                self.tile_size = tile_size
+                clear_tile_cache()
+
+        self.renderer.screen = self.screen
+        self.renderer.invalidate()
+        self.animation = None
+        self.needs_redraw = True
+
+    def toggle_autoplay(self) -> None:
+        self.is_autoplay = not self.is_autoplay
+
+    def toggle_hint(self) -> None:
+        self.is_hint_on = not self.is_hint_on
+        if not self.is_hint_on:
+            self.hints.cancel()
+
+    def instrument(self) -> None:
+        """hot paths timed by `self.profiler`, nothing is wrapped until enabled"""
+
+        # helper functions
+        def hit_rate(hits: int, total: int) -> str:
+            return f"{hits / total:.1%}" if total else "-"
+
+        def tile_hit_rate() -> str:
+            drawn = calls("tile drawing")
+            return hit_rate(drawn - calls("tile renders"), drawn)
+
+        def font_hit_rate() -> str:
+            info = font.cache_info()
+            return hit_rate(info.hits, info.hits + info.misses)
+
+        profiler = self.profiler
+        calls = profiler.calls
+        profiler.instrument(self, "handle_events")
+        profiler.instrument(Classic2048, "move", "engine move")
+        profiler.instrument(
+            sys.modules[__name__], "draw_tile_using_config", "tile drawing"
+        )
+        profiler.instrument(tile_drawer, "draw_tile", "tile renders")
+        profiler.instrument(Display, "update_surface", "display renders")
+        profiler.instrument(pygame.display, "update", "display.update")
+        profiler.gauge(
+            "surfaces allocated",
+            lambda: str(calls("tile renders") + calls("display renders")),
+        )
+        profiler.gauge("tile cache hits", tile_hit_rate)
+        profiler.gauge("font cache hits", font_hit_rate)
+
+    def toggle_profiler(self) -> None:
+        """hiding the overlay writes what it measured to `config.PROFILE_FILE`"""
+        if self.profiler.enabled:
+            self.profiler.disable()
+            self.profiler.dump(user_path / config.PROFILE_FILE)
+            self.profile_overlay = None
+        else:
+            self.profiler.enable()
+        self.needs_redraw = True
+
+    def draw_profile(self) -> pygame.Surface:
+        f, _ = font(16, 22)
+        lines = [f.render(line, True, "white") for line in self.profiler.report()]
+        surface = pygame.Surface(
+            (
+                max(line.get_width() for line in lines) + 16,
+                sum(line.get_height() for line in lines) + 16,
+            )
+        )
+        surface.set_alpha(200)
+        y = 8
+        for line in lines:
+            surface.blit(line, (8, y))
+            y += line.get_height()
+        return surface
+
+    def tile_pos(self, cell: int) -> tuple[float, float]:
+        """top left corner of a board cell (i * col + j) on the screen"""
+        self.game = cast(Classic2048, self.game)
+        i, j = divmod(cell, self.game.col)
+        width, height = self.screen.get_size()
+        return (
+            width / 2 + (j - self.game.col / 2) * self.tile_size,
+            height / 2 + (i - self.game.row / 2) * self.tile_size,
+        )
+
+    def board_rect(self) -> pygame.Rect:
+        self.game = cast(Classic2048, self.game)
+        return pygame.Rect(
+            self.tile_pos(0),
+            (self.game.col * self.tile_size, self.game.row * self.tile_size),
+        )
+
+    def start_animation(self) -> None:
+        """slide the tiles of the last move, the new tile shows up at the end"""
+        self.game = cast(Classic2048, self.game)
+        assert self.game.last_move is not None
+        before = self.game.decode(self.game.last_move[0])
+        moves, _ = self.game.move_trace()
+        empty = draw_tile_using_config(0, self.tile_size)
+        self.animation = SlideAnimation(
+            [
+                (
+                    draw_tile_using_config(
+                        before[src // self.game.col][src % self.game.col],
+                        self.tile_size,
+                    ),
+                    self.tile_pos(src),
+                    self.tile_pos(dst),
+                )
+                for src, dst, _ in moves
+            ],
+            [
+                (empty, self.tile_pos(cell))
+                for cell in range(self.game.row * self.game.col)
+            ],
+            perf_counter(),
+            config.SLIDE_TIME,
+            config.SLIDE_UPDATE_RATE,
+        )
+
+    def move(self, *directions: Direction) -> None:
+        """make the moves in order, only the last one that moved is animated"""
+        self.game = cast(Classic2048, self.game)
+        moved = False
+        for direction in directions:
+            if self.game.move(direction):
+                self.record(RecordWriter.add_move)
+                moved = True
+        if moved:
+            self.show_move()
+
+    def show_move(self) -> None:
+        self.game = cast(Classic2048, self.game)
+        self.hints.cancel()
+        self.start_animation()
+        if self.game.game_over:
+            self.game_over_sound.play()
+        else:
+            self.slide_sound.play()
+
+    def undo(self) -> None:
+        self.game = cast(Classic2048, self.game)
+        if self.game.undo():
+            self.record(RecordWriter.undo)
+            self.hints.cancel()
+            self.animation = None
+            self.click_sound.play()
+
+    def redo(self) -> None:
+        """the move is animated as if it was made again"""
+        self.game = cast(Classic2048, self.game)
+        if self.game.redo():
+            self.record(RecordWriter.add_move)
+            self.show_move()
+
     def start_game(self) -> None:
-        self.game = Classic2048(self.row, self.col)
+        self.game = game = Classic2048(self.row, self.col, keep_history=True)
+        if self.is_recording and self.recorder is None:
+            path = data_path / config.RECORD_FILE
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                self.recorder = RecordWriter.open(path)
+            except (OSError, ValueError):
+                # e.g. a record file of an older version, left as it is
+                self.is_recording = False
+        # games past the size limit are not recorded
+        if self.recorder and self.recorder.file.tell() >= config.RECORD_MAX_SIZE:
+            self.stop_recording()
+        self.record(lambda recorder: recorder.start_game(game))
         self.is_gaming = True
+        self.update_layout()
+
+    def end_game(self) -> None:
+        """back to the main menu"""
+        self.record(RecordWriter.end_game)
+        self.is_gaming = False
+
+    def record(self, write: Callable[[RecordWriter], None]) -> None:
+        """`write` to the record file, if recording, which stops on any error"""
+        if self.recorder is None:
+            return
+        try:
+            write(self.recorder)
+        except OSError:
+            self.stop_recording()
+
+    def stop_recording(self) -> None:
+        """closes the record file, no more games are recorded"""
+        recorder, self.recorder = self.recorder, None
+        self.is_recording = False
+        if recorder is not None:
+            try:
+                recorder.close()
+            except OSError:
+                pass  # the file is unusable anyway
 
     def change_row_col(
         self,
@@ -299,129 +632,257 @@ class App:
                 self.col = clip(self.col, 2, 9)
                 self.mainmenu_disps["col_disp"].content = str(self.col)
 
+    def is_idle(self) -> bool:
+        """nothing changes until the next event"""
+        return (
+            self.animation is None
+            and not (
+                self.is_gaming
+                and self.is_autoplay
+                and not cast(Classic2048, self.game).game_over
+            )
+            # frames are measured while profiling
+            and not self.profiler.enabled
+        )
+
     def handle_events(self) -> None:
         # helper functions
-        def handle_mainmenu_events() -> None:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == pygame.KEYDOWN:
-                    if event.key in (
-                        pygame.K_RETURN,
-                        pygame.K_SPACE,
-                        pygame.K_KP_5,
-                        pygame.K_KP_ENTER,
-                        pygame.K_KP_0,
-                    ):
+        def handle_mainmenu_event(event: pygame.event.Event) -> bool:
+            if event.type == pygame.KEYDOWN:
+                match self.keymap.get(event.key):
+                    case "confirm":
                         self.start_game()
-                    elif event.key in (pygame.K_m,):
+                    case "toggle_bgm":
                         self.toggle_bgm()
                         self.click_sound.play()
-                    else:
-                        for params, keys in {
-                            ("col", -1): (pygame.K_LEFT, pygame.K_a, pygame.K_KP4),
-                            ("col", 1): (pygame.K_RIGHT, pygame.K_d, pygame.K_KP6),
-                            ("row", 1): (pygame.K_UP, pygame.K_w, pygame.K_KP8),
-                            ("row", -1): (pygame.K_DOWN, pygame.K_s, pygame.K_KP2),
-                        }.items():
-                            params = cast(
-                                tuple[Literal["row", "col"], Literal[1, -1]], params
-                            )
-                            if event.key in keys:
-                                self.change_row_col(*params)
-                                self.click_sound.play()
-                                break
-                for btn in self.mainmenu_btns.values():
-                    btn.handle_events(event)
-
-            self.update_display()
+                    case "left" | "right" | "up" | "down" as direction:
+                        self.change_row_col(*MENU_STEPS[direction])
+                        self.click_sound.play()
+            return self.mainmenu_router.route(event)
 
-        def handle_game_events() -> None:
+        def handle_game_event(event: pygame.event.Event) -> bool:
             self.game = cast(Classic2048, self.game)
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == pygame.KEYDOWN:
-                    if event.key in (
-                        pygame.K_r,
-                        pygame.K_ESCAPE,
-                        pygame.K_KP_PERIOD,
-                    ):
-                        self.is_gaming = False
-                    elif event.key in (pygame.K_m,):
+            if event.type == pygame.KEYDOWN:
+                match self.keymap.get(event.key):
+                    case "back":
+                        self.end_game()
+                    case "undo":
+                        # moves before it are made first
+                        self.move(*self.pending_moves)
+                        self.pending_moves.clear()
+                        self.undo()
+                    case "redo":
+                        self.move(*self.pending_moves)
+                        self.pending_moves.clear()
+                        self.redo()
+                    case "toggle_bgm":
                         self.toggle_bgm()
                         self.click_sound.play()
-                    elif is_dev_env and event.key in (pygame.K_F2,):
+                    case "toggle_autoplay":
+                        self.toggle_autoplay()
+                        self.click_sound.play()
+                    case "toggle_hint":
+                        self.toggle_hint()
+                        self.click_sound.play()
+                    case "debug_game_over" if is_dev_env:
                         self.game.game_over = True
-                    else:
-                        for direction, keys in {
-                            "left": (pygame.K_LEFT, pygame.K_a, pygame.K_KP4),
-                            "right": (pygame.K_RIGHT, pygame.K_d, pygame.K_KP6),
-                            "up": (pygame.K_UP, pygame.K_w, pygame.K_KP8),
-                            "down": (pygame.K_DOWN, pygame.K_s, pygame.K_KP2),
-                        }.items():
-                            direction = cast(Direction, direction)
-                            if event.key in keys:
-                                if self.game.move(direction):
-                                    if self.game.game_over:
-                                        self.game_over_sound.play()
-                                    else:
-                                        self.slide_sound.play()
-                                break
-
-                for btn in self.ingame_btns.values():
-                    btn.handle_events(event)
-
-                self.update_display()
-
-        handle_game_events() if self.is_gaming else handle_mainmenu_events()
+                    case "left" | "right" | "up" | "down" as direction:
+                        # applied together in `update`, see `move`
+                        self.pending_moves.append(direction)
+
+            return self.ingame_router.route(event)
+
+        # sleep until something happens unless a frame is due anyway
+        events = pygame.event.get()
+        if not events and self.is_idle() and not self.needs_redraw:
+            events = [pygame.event.wait()]
+
+        resized = False
+        for event in events:
+            # a held toggle would flip back and forth, only its press counts
+            if event.type == pygame.KEYDOWN:
+                action = self.keymap.get(event.key)
+                if event.key in self.held_keys and action not in REPEATABLE:
+                    continue
+                self.held_keys.add(event.key)
+            elif event.type == pygame.KEYUP:
+                self.held_keys.discard(event.key)
+            elif event.type == pygame.WINDOWFOCUSLOST:
+                # the keys may be released elsewhere
+                self.held_keys.clear()
+
+            if event.type == pygame.QUIT:
+                self.stop_recording()
+                self.hints.close()
+                pygame.quit()
+                sys.exit()
+            elif event.type == pygame.VIDEORESIZE and not self.is_fullscreen:
+                self.windowed_size = event.size
+                resized = True
+            elif event.type in (pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED):
+                # the window lost its contents, present all of it again
+                self.renderer.invalidate()
+            elif (
+                event.type == pygame.KEYDOWN
+                and self.keymap.get(event.key) == "toggle_fullscreen"
+            ):
+                self.toggle_fullscreen()
+            elif (
+                event.type == pygame.KEYDOWN
+                and self.keymap.get(event.key) == "toggle_profiler"
+                and is_dev_env
+            ):
+                self.toggle_profiler()
+            else:
+                reached_button = (
+                    handle_game_event(event)
+                    if self.is_gaming
+                    else handle_mainmenu_event(event)
+                )
+                # the pointer moving anywhere else changes nothing on screen
+                if event.type == pygame.MOUSEMOTION and not reached_button:
+                    continue
+            self.needs_redraw = True
+
+        # a window drag sends many sizes, only the last one is laid out
+        if resized:
+            self.update_layout()
+
+    def update(self) -> None:
+        # the overlay is redrawn a few times per second, not on every frame
+        now = perf_counter()
+        if self.profiler.enabled and now - self.profile_drawn_at > 0.5:
+            self.profile_overlay = self.draw_profile()
+            self.profile_drawn_at = now
+            self.needs_redraw = True
+
+        if not self.is_gaming:
+            self.animation = None
+            self.pending_moves.clear()
+            return
+        self.game = cast(Classic2048, self.game)
+
+        # a burst of key repeats is played at once, in order
+        if self.pending_moves:
+            self.move(*self.pending_moves)
+            self.pending_moves.clear()
+
+        if self.animation:
+            self.animation.update(perf_counter())
+            if self.animation.done:
+                self.animation = None
+                self.needs_redraw = True
+
+        # the search is bounded by `config.AI_TIME_BUDGET` per move,
+        # the next one starts once the last move has been shown
+        if self.is_autoplay and not self.game.game_over and not self.animation:
+            if direction := self.ai.best_move(self.game):
+                self.move(direction)
+            self.needs_redraw = True
+
+        # hints are searched in the background, `HINT_READY` wakes up the loop
+        if self.is_hint_on and not self.game.game_over:
+            self.hints.request(self.game)
+            if (
+                self.hints.is_ready(self.game)
+                and self.hint_shown_for != self.game.bitboard
+            ):
+                self.needs_redraw = True
+
+    def render(self) -> None:
+        if self.animation:
+            # the board changes on every frame, everything else waits
+            self.renderer.render_area(self.board_rect(), self.animation.layers())
+        elif self.needs_redraw:
+            self.update_display()
+            self.needs_redraw = False
 
     def update_display(self) -> None:
         # helper functions
-        def update_mainmenu_display() -> None:
-            for disp in self.mainmenu_disps.values():
-                disp.draw(self.screen)
-            for btn in self.mainmenu_btns.values():
-                btn.draw(self.screen)
+        def mainmenu_layers() -> list[Layer]:
+            return [
+                (widget.surface, widget.topleft)
+                for widget in (
+                    *self.mainmenu_disps.values(),
+                    *self.mainmenu_btns.values(),
+                )
+            ]
 
-        def update_game_display() -> None:
+        def game_layers() -> list[Layer]:
             self.game = cast(Classic2048, self.game)
-            # draw board
-            for i in range(self.game.row):
-                for j in range(self.game.col):
-                    self.screen.blit(
-                        draw_tile_using_config(self.game.board[i][j]),
-                        (
-                            config.WINDOW_SIZE["width"] / 2
-                            + (j - self.game.col / 2) * config.TILE_SIZE,
-                            config.WINDOW_SIZE["height"] / 2
-                            + (i - self.game.row / 2) * config.TILE_SIZE,
-                        ),
-                    )
+            # board, tiles are cached so unchanged tiles keep their surface
+            board = self.game.board
+            layers: list[Layer] = [
+                (
+                    draw_tile_using_config(board[i][j], self.tile_size),
+                    self.tile_pos(i * self.game.col + j),
+                )
+                for i in range(self.game.row)
+                for j in range(self.game.col)
+            ]
+            disps: list[Display] = []
+
+            # score
+            score = f"Score: {self.game.score}"
+            if self.is_autoplay:
+                stats = self.ai.stats()
+                score += f"    AI: {stats['nodes_per_sec']:.0f} nodes/s"
+                if "cache_hit_rate" in stats:
+                    score += f", {stats['cache_hit_rate']:.0%} cache hits"
+            self.ingame_disps["score"].content = score
+            disps.append(self.ingame_disps["score"])
 
-            # draw score
-            self.ingame_disps["score"].content = f"Score: {self.game.cal_score()}"
-            self.ingame_disps["score"].draw(self.screen)
+            # hint
+            hint = self.hints.hint(self.game) if self.is_hint_on else None
+            if hint and not self.game.game_over:
+                half_width = self.game.col * self.tile_size / 2 - 60 * self.scale
+                half_height = self.game.row * self.tile_size / 2 - 27 * self.scale
+                dx, dy = {
+                    "left": (-half_width, 0),
+                    "right": (half_width, 0),
+                    "up": (0, -half_height),
+                    "down": (0, half_height),
+                }[hint]
+                self.ingame_disps["hint"].content = hint.upper()
+                self.ingame_disps["hint"].pos = (
+                    self.screen.get_width() / 2 + dx,
+                    self.screen.get_height() / 2 + dy,
+                )
+                disps.append(self.ingame_disps["hint"])
+                self.hint_shown_for = self.game.bitboard
 
-            # draw game over
+            # game over
             if self.game.game_over:
-                self.ingame_disps["game_over"].draw(self.screen)
-                self.ingame_disps["reset_tip"].draw(self.screen)
+                disps.append(self.ingame_disps["game_over"])
+                disps.append(self.ingame_disps["reset_tip"])
 
-            # draw buttons
-            for btn in self.ingame_btns.values():
-                btn.draw(self.screen)
+            # buttons
+            disps.extend(self.ingame_btns.values())
 
-        self.screen.fill(config.BG_COLOR)
-        update_game_display() if self.is_gaming else update_mainmenu_display()
-        pygame.display.update()
+            return layers + [(disp.surface, disp.topleft) for disp in disps]
+
+        layers = game_layers() if self.is_gaming else mainmenu_layers()
+        if self.profile_overlay is not None:
+            layers.append((self.profile_overlay, (8, 8)))
+        # only what changed since the last frame is repainted
+        self.renderer.render(layers)
 
     def run(self):
+        self.render()
+        self.startup.lap("first frame")
+        if is_dev_env:
+            print(self.startup.report())
+
         while True:
             self.handle_events()
+            self.update()
+            self.render()
+            self.clock.tick(config.FPS)
+            if self.profiler.enabled:
+                self.profiler.end_frame()
 
 
 if __name__ == "__main__":
+    # a frozen build runs the hint process through this executable too
+    multiprocessing.freeze_support()
     App().run()
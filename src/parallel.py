@@ -0,0 +1,87 @@
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from math import ceil
+from time import perf_counter
+from typing import Callable
+
+from record import RecordWriter
+from simulate import SimulationStats, simulate
+
+
+def shards(games: int, chunk_size: int) -> list[tuple[int, int]]:
+    """split game indices into (first game, game count) chunks"""
+    return [
+        (first, min(chunk_size, games - first)) for first in range(0, games, chunk_size)
+    ]
+
+
+def simulate_recorded(
+    row: int, col: int, games: int, policy: str, seed: int, first_game: int
+) -> tuple[SimulationStats, bytes]:
+    """`simulate`, with the games recorded in memory for the parent to save"""
+    buffer = io.BytesIO()
+    record = RecordWriter(buffer, header=False)
+    stats = simulate(row, col, games, policy, seed, first_game, record)
+    return stats, buffer.getvalue()
+
+
+def run_parallel(
+    row: int,
+    col: int,
+    games: int,
+    policy: str,
+    seed: int,
+    workers: int | None = None,
+    chunk_size: int | None = None,
+    on_progress: Callable[[SimulationStats], None] | None = None,
+    record: RecordWriter | None = None,
+) -> SimulationStats:
+    """
+    Same as `simulate.simulate`, with the games spread over a process pool.
+    Each game is seeded by its index alone, so the totals do not depend on
+    `workers` or `chunk_size`. Workers send back one `SimulationStats` per
+    chunk, which is merged as soon as it arrives, and its games are appended
+    to `record` then, so they are in the order the chunks finished.
+    """
+    workers = workers or os.cpu_count() or 1
+    # a few chunks per worker keeps them busy until the end of the run
+    chunk_size = chunk_size or max(1, min(256, ceil(games / (workers * 4))))
+
+    stats = SimulationStats()
+    start = perf_counter()
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [
+            pool.submit(
+                simulate_recorded if record else simulate,
+                row,
+                col,
+                size,
+                policy,
+                seed,
+                first,
+            )
+            for first, size in shards(games, chunk_size)
+        ]
+        for future in as_completed(futures):
+            if record:
+                chunk, frames = future.result()
+                record.extend(frames)
+            else:
+                chunk = future.result()
+            stats.merge(chunk)
+            stats.elapsed = perf_counter() - start
+            if on_progress:
+                on_progress(stats)
+    stats.elapsed = perf_counter() - start
+    return stats
+
+
+if __name__ == "__main__":
+    single = simulate(4, 4, 200, "random", 0)
+    print(f"1 process: {single.summary()['moves_per_sec']:.0f} moves/s")
+    for workers in (2, os.cpu_count() or 1):
+        stats = run_parallel(4, 4, 200, "random", 0, workers)
+        assert sorted(stats.scores) == sorted(single.scores)
+        assert stats.max_tiles == single.max_tiles
+        print(f"{workers} processes: {stats.summary()['moves_per_sec']:.0f} moves/s")
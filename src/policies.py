@@ -0,0 +1,94 @@
+from random import Random
+from typing import Callable
+
+from classic2048 import DIRECTIONS, Bitboard, Classic2048, Direction
+from expectimax import Expectimax
+
+type Policy = Callable[[Classic2048], Direction | None]
+
+
+def valid_moves(game: Classic2048) -> list[Direction]:
+    return [d for d in DIRECTIONS if game.next_bitboards[d] != game.bitboard]
+
+
+def random_policy(seed: int | None = None) -> Policy:
+    """pick uniformly among the moves that change the board"""
+    rng = Random(seed)
+
+    def policy(game: Classic2048) -> Direction | None:
+        moves = valid_moves(game)
+        return rng.choice(moves) if moves else None
+
+    return policy
+
+
+def greedy_policy(seed: int | None = None) -> Policy:
+    """pick the move gaining the most score, then leaving the most empty cells"""
+
+    def policy(game: Classic2048) -> Direction | None:
+        best, best_value = None, None
+        for direction in DIRECTIONS:
+            bitboard, score = game.next_bitboards.get_with_score(direction)
+            if bitboard == game.bitboard:
+                continue
+            value = (score, game.empty_cells(bitboard).bit_count())
+            if best_value is None or value > best_value:
+                best, best_value = direction, value
+        return best
+
+    return policy
+
+
+def search_policy(seed: int | None = None, depth: int = 3) -> Policy:
+    """
+    Look `depth` moves ahead, ignoring spawns, and pick the first move of the
+    line with the most score gained plus empty cells left.
+    """
+
+    def value(game: Classic2048, bitboard: Bitboard, depth: int) -> int:
+        if depth == 0:
+            return game.empty_cells(bitboard).bit_count()
+        best = game.empty_cells(bitboard).bit_count()
+        for direction in DIRECTIONS:
+            next_bitboard, score = game.slide(bitboard, direction)
+            if next_bitboard != bitboard:
+                best = max(best, score + value(game, next_bitboard, depth - 1))
+        return best
+
+    def policy(game: Classic2048) -> Direction | None:
+        best, best_value = None, None
+        for direction in DIRECTIONS:
+            bitboard, score = game.next_bitboards.get_with_score(direction)
+            if bitboard == game.bitboard:
+                continue
+            v = score + value(game, bitboard, depth - 1)
+            if best_value is None or v > best_value:
+                best, best_value = direction, v
+        return best
+
+    return policy
+
+
+def expectimax_policy(seed: int | None = None, depth: int = 2) -> Policy:
+    """
+    `Expectimax.best_move` without a time budget, so runs stay reproducible.
+    The searcher is reachable as `policy.__self__` for its statistics.
+    """
+    return Expectimax(depth).best_move
+
+
+POLICIES: dict[str, Callable[[int | None], Policy]] = {
+    "random": random_policy,
+    "greedy": greedy_policy,
+    "search": search_policy,
+    "expectimax": expectimax_policy,
+}
+
+
+if __name__ == "__main__":
+    for name, make_policy in POLICIES.items():
+        game = Classic2048(seed=0)
+        policy = make_policy(0)
+        while (direction := policy(game)) is not None:
+            game.move(direction)
+        print(name, game.score, game.max_tile())
@@ -0,0 +1,204 @@
+import json
+from collections import deque
+from collections.abc import Callable
+from functools import wraps
+from os import PathLike
+from statistics import fmean, quantiles
+from time import perf_counter
+from typing import Any
+
+
+class Section:
+    """time spent in one instrumented function"""
+
+    def __init__(self, frames: int):
+        self.calls: int = 0  # since the profiler was enabled
+        self.time: float = 0.0  # in the current frame
+        self.frame_times: deque[float] = deque(maxlen=frames)
+
+
+class Profiler:
+    """
+    Times instrumented functions per frame. A function is only wrapped while
+    the profiler is enabled, the rest of the time the original is in place,
+    so instrumenting costs nothing until it is switched on.
+    """
+
+    def __init__(self, frames: int = 600):
+        """statistics are kept for the last `frames` frames"""
+        self.frames = frames
+        self.enabled: bool = False
+        # (owner, attribute, section name)
+        self.targets: list[tuple[Any, str, str]] = []
+        # (owner, attribute, original, whether the owner held it itself)
+        self.patches: list[tuple[Any, str, Any, bool]] = []
+        self.sections: dict[str, Section] = {}
+        self.gauges: dict[str, Callable[[], str]] = {}
+        self.frame_times: deque[float] = deque(maxlen=frames)
+        self.last_frame: float = 0.0
+
+    def instrument(self, owner: Any, attribute: str, name: str | None = None) -> None:
+        """
+        Time `owner.attribute` as section `name`. `owner` can be a module,
+        class or instance, whichever the callers look the function up on.
+        """
+        self.targets.append((owner, attribute, name or attribute))
+        if self.enabled:
+            self.patch(*self.targets[-1])
+
+    def gauge(self, name: str, read: Callable[[], str]) -> None:
+        """a value only read when the statistics are, e.g. a cache hit rate"""
+        self.gauges[name] = read
+
+    def patch(self, owner: Any, attribute: str, name: str) -> None:
+        section = self.sections.setdefault(name, Section(self.frames))
+        original = getattr(owner, attribute)
+
+        @wraps(original)
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                section.time += perf_counter() - start
+                section.calls += 1
+
+        own = attribute in getattr(owner, "__dict__", {})
+        self.patches.append((owner, attribute, original, own))
+        setattr(owner, attribute, timed)
+
+    def enable(self) -> None:
+        if self.enabled:
+            return
+        self.enabled = True
+        self.sections.clear()
+        self.frame_times.clear()
+        for target in self.targets:
+            self.patch(*target)
+        self.last_frame = perf_counter()
+
+    def disable(self) -> None:
+        if not self.enabled:
+            return
+        self.enabled = False
+        for owner, attribute, original, own in reversed(self.patches):
+            if own:
+                setattr(owner, attribute, original)
+            else:
+                delattr(owner, attribute)  # the class attribute shows again
+        self.patches.clear()
+
+    def end_frame(self) -> None:
+        """call once per frame while enabled"""
+        now = perf_counter()
+        self.frame_times.append(now - self.last_frame)
+        self.last_frame = now
+        for section in self.sections.values():
+            section.frame_times.append(section.time)
+            section.time = 0.0
+
+    def calls(self, name: str) -> int:
+        return self.sections[name].calls if name in self.sections else 0
+
+    def stats(self) -> dict[str, Any]:
+        """frame rate, frame time percentiles and ms per frame of each section"""
+        times = list(self.frame_times)
+        p50, p90, p99 = (
+            [quantiles(times, n=100, method="inclusive")[p] for p in (49, 89, 98)]
+            if len(times) > 1
+            else times * 3 or [0.0] * 3
+        )
+        return {
+            "frames": len(times),
+            "fps": len(times) / sum(times) if times else 0.0,
+            "frame_ms": {
+                "p50": p50 * 1000,
+                "p90": p90 * 1000,
+                "p99": p99 * 1000,
+                "max": max(times, default=0.0) * 1000,
+            },
+            "sections": {
+                name: {
+                    "calls": section.calls,
+                    "ms_per_frame": (
+                        fmean(section.frame_times) * 1000
+                        if section.frame_times
+                        else 0.0
+                    ),
+                    "max_ms": max(section.frame_times, default=0.0) * 1000,
+                }
+                for name, section in self.sections.items()
+            },
+            "gauges": {name: read() for name, read in self.gauges.items()},
+        }
+
+    def report(self) -> list[str]:
+        """`stats` as short lines, e.g. for an overlay"""
+        stats = self.stats()
+        frame = stats["frame_ms"]
+        return (
+            [
+                f"{stats['fps']:.0f} fps, frame p50 {frame['p50']:.1f} "
+                f"p90 {frame['p90']:.1f} p99 {frame['p99']:.1f} ms"
+            ]
+            + [
+                f"{name}: {section['ms_per_frame']:.2f} ms/frame, {section['calls']} calls"
+                for name, section in stats["sections"].items()
+            ]
+            + [f"{name}: {value}" for name, value in stats["gauges"].items()]
+        )
+
+    def dump(self, path: str | PathLike[str]) -> None:
+        """`stats` and the raw frame and section times in ms, as JSON"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    **self.stats(),
+                    "frame_times_ms": [t * 1000 for t in self.frame_times],
+                    "section_times_ms": {
+                        name: [t * 1000 for t in section.frame_times]
+                        for name, section in self.sections.items()
+                    },
+                },
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    import math
+    import tempfile
+    from pathlib import Path
+    from time import sleep
+
+    class Ticker:
+        def tick(self) -> None:
+            sleep(0.001)
+
+    ticker = Ticker()
+    profiler = Profiler()
+    profiler.instrument(math, "factorial")
+    profiler.instrument(ticker, "tick", "Ticker.tick")
+    profiler.gauge("answer", lambda: "42")
+    factorial = math.factorial
+
+    # nothing is wrapped until enabled
+    assert "tick" not in vars(ticker)
+    profiler.enable()
+    assert math.factorial is not factorial and "tick" in vars(ticker)
+    for _ in range(10):
+        math.factorial(2000)
+        ticker.tick()
+        sleep(0.01)
+        profiler.end_frame()
+    profiler.disable()
+    assert math.factorial is factorial and "tick" not in vars(ticker)
+
+    stats = profiler.stats()
+    assert stats["frames"] == 10 and 50 < stats["fps"] < 100
+    assert stats["sections"]["factorial"]["calls"] == 10
+    print("\n".join(profiler.report()))
+    with tempfile.TemporaryDirectory() as tmp:
+        profiler.dump(Path(tmp) / "profile.json")
+        dump = json.loads((Path(tmp) / "profile.json").read_text())
+        assert len(dump["section_times_ms"]["Ticker.tick"]) == 10
@@ -0,0 +1,390 @@
+import mmap
+import struct
+from bisect import bisect_right
+from collections.abc import Iterator
+from os import PathLike
+from typing import BinaryIO
+
+from classic2048 import DIRECTIONS, Classic2048, Direction
+
+# A record file is this header followed by frames, each starting with a tag:
+#   G  a game starts: row, col, seed of its `SpawnRNG`
+#   M  moves, one byte each: direction index | spawned cell << 2
+#   K  keyframe: moves made, score, rng state, then one byte per cell
+#   U  the last moves were undone: how many
+#   E  the game ended: moves made, score, whether it was over
+# Frames are only ever appended, a game is written while it is played and
+# a frame cut short at the end of the file (e.g. by a crash) is ignored.
+# Move counts and scores are 64 bits, a single 524288 tile scores over 2^32.
+MAGIC = b"2048rec\x02"
+GAME = struct.Struct("<cBBQ")
+MOVES = struct.Struct("<cH")
+KEYFRAME = struct.Struct("<cQQQ")
+UNDO = struct.Struct("<cH")
+END = struct.Struct("<cQQB")
+
+# 6 bits for the spawned cell
+MAX_CELLS = 64
+
+
+def pack_move(direction: Direction, spawn: int) -> int:
+    return DIRECTIONS.index(direction) | spawn << 2
+
+
+def unpack_move(move: int) -> tuple[Direction, int]:
+    """(direction, spawned cell)"""
+    return DIRECTIONS[move & 3], move >> 2
+
+
+class RecordWriter:
+    """
+    Streams games to a record file: `start_game` when a game is created,
+    `add_move` after each of its successful moves and `end_game` when it is
+    over or abandoned. Moves are buffered until the next keyframe, which is
+    written every `keyframe_interval` moves, or until `flush`.
+    """
+
+    def __init__(
+        self,
+        file: BinaryIO,
+        keyframe_interval: int = 256,
+        header: bool | None = None,
+    ):
+        """`header` defaults to writing one at the start of the file only"""
+        self.file = file
+        self.keyframe_interval = min(keyframe_interval, 0xFFFF)
+        self.game: Classic2048 | None = None
+        self.moves = bytearray()  # not written yet
+        self.count = 0  # moves of the current game
+        if header if header is not None else file.tell() == 0:
+            file.write(MAGIC)
+
+    @classmethod
+    def open(cls, path: str | PathLike[str], **kwargs) -> "RecordWriter":
+        """
+        append to the record file at `path`, creating it if needed,
+        ValueError if it is not a record file of this version
+        """
+        file = open(path, "ab+")
+        if file.tell():
+            file.seek(0)
+            magic = file.read(len(MAGIC))
+            file.seek(0, 2)
+            if magic != MAGIC:
+                file.close()
+                raise ValueError(f"{path}: not a game record file of this version")
+        return cls(file, **kwargs)
+
+    def start_game(self, game: Classic2048) -> None:
+        """ends the game recorded so far, `game` must not have moved yet"""
+        if game.row * game.col > MAX_CELLS:
+            raise ValueError(f"boards over {MAX_CELLS} cells cannot be recorded")
+        # the constructor draws once, for the first tile
+        if game.last_move is not None or game.draws != 1:
+            raise ValueError("only new games can be recorded")
+        self.end_game()
+        self.game = game
+        self.count = 0
+        self.file.write(GAME.pack(b"G", game.row, game.col, game.seed))
+
+    def add_move(self) -> None:
+        """record the move the game just made"""
+        game = self.game
+        assert game is not None and game.last_move is not None
+        assert game.last_spawn is not None  # a move always frees a cell
+        self.moves.append(pack_move(game.last_move[1], game.last_spawn))
+        self.count += 1
+        if self.count % self.keyframe_interval == 0:
+            self.write_moves()
+            self.file.write(
+                KEYFRAME.pack(b"K", self.count, game.score, game.rng_state)
+                + game.bitboard.to_bytes(game.row * game.col, "little")
+            )
+
+    def undo(self) -> None:
+        """take back the last recorded move, after `Classic2048.undo`"""
+        assert self.count > 0
+        self.count -= 1
+        if self.moves:
+            self.moves.pop()
+        else:
+            self.file.write(UNDO.pack(b"U", 1))
+
+    def write_moves(self) -> None:
+        if self.moves:
+            self.file.write(MOVES.pack(b"M", len(self.moves)) + self.moves)
+            self.moves.clear()
+
+    def flush(self) -> None:
+        """write out everything recorded so far"""
+        self.write_moves()
+        self.file.flush()
+
+    def end_game(self) -> None:
+        if self.game is None:
+            return
+        self.write_moves()
+        self.file.write(
+            END.pack(b"E", self.count, self.game.score, self.game.game_over)
+        )
+        self.file.flush()
+        self.game = None
+
+    def extend(self, frames: bytes) -> None:
+        """append whole games written by a writer without a header"""
+        self.end_game()
+        self.file.write(frames)
+
+    def close(self) -> None:
+        self.end_game()
+        self.file.close()
+
+    def __enter__(self) -> "RecordWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class GameRecord:
+    """
+    One game of a record file, read in place from the file's memory map.
+    Any move can be replayed from the closest keyframe before it.
+    """
+
+    def __init__(self, data: mmap.mmap | bytes, row: int, col: int, seed: int):
+        self.data = data
+        self.row = row
+        self.col = col
+        self.seed = seed
+        self.segments: list[tuple[int, int]] = []  # (offset, length) of moves
+        # (moves made, score, rng state, offset of the cells)
+        self.keyframes: list[tuple[int, int, int, int]] = []
+        # (moves made, score, game over), None if the game was not ended
+        self.result: tuple[int, int, bool] | None = None
+
+    def take_back(self, count: int) -> None:
+        """drop the last `count` moves and the keyframes after them"""
+        while count:
+            offset, length = self.segments.pop()
+            if length > count:
+                self.segments.append((offset, length - count))
+                break
+            count -= length
+        moves = len(self)
+        self.keyframes = [frame for frame in self.keyframes if frame[0] <= moves]
+
+    def __len__(self) -> int:
+        return sum(length for _, length in self.segments)
+
+    @property
+    def moves(self) -> bytes:
+        return b"".join(self.data[i : i + n] for i, n in self.segments)
+
+    def directions(self) -> list[Direction]:
+        return [DIRECTIONS[move & 3] for move in self.moves]
+
+    def replay(self, index: int | None = None) -> Classic2048:
+        """the game after its first `index` moves, all of them by default"""
+        moves = self.moves
+        index = len(moves) if index is None else index
+        if not 0 <= index <= len(moves):
+            raise IndexError(f"move {index} of a {len(moves)} move game")
+
+        game = Classic2048(self.row, self.col, self.seed)
+        start = 0
+        if k := bisect_right(self.keyframes, index, key=lambda frame: frame[0]):
+            start, score, state, offset = self.keyframes[k - 1]
+            cells = self.row * self.col
+            game.bitboard = int.from_bytes(self.data[offset : offset + cells], "little")
+            game.score = score
+            game.rng_state = state
+            game.last_spawn = None
+            game.game_over = game.is_game_over()
+
+        for move in moves[start:index]:
+            direction, spawn = unpack_move(move)
+            if not game.move(direction) or game.last_spawn != spawn:
+                raise ValueError(f"move {start} does not replay, corrupt record?")
+            start += 1
+        return game
+
+
+class RecordReader:
+    """
+    Scans the games of a record file through a read-only memory map,
+    so only the parts of the file that are looked at are read.
+    """
+
+    def __init__(self, path: str | PathLike[str]):
+        self.path = path
+        with open(path, "rb") as f:
+            self.data: mmap.mmap | bytes = (
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                if f.seek(0, 2)
+                else b""
+            )
+        if self.data[: len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path}: not a game record file")
+
+    def __iter__(self) -> Iterator[GameRecord]:
+        data, pos, end = self.data, len(MAGIC), len(self.data)
+        game: GameRecord | None = None
+
+        while pos < end:
+            tag = data[pos : pos + 1]
+            if tag == b"G":
+                if pos + GAME.size > end:
+                    break
+                if game is not None:
+                    yield game  # not ended
+                _, row, col, seed = GAME.unpack_from(data, pos)
+                game = GameRecord(data, row, col, seed)
+                pos += GAME.size
+                continue
+            if game is None or tag not in (b"M", b"K", b"U", b"E"):
+                raise ValueError(f"{self.path}: bad frame at byte {pos}")
+
+            if tag == b"M":
+                if pos + MOVES.size > end:
+                    break
+                _, length = MOVES.unpack_from(data, pos)
+                size = MOVES.size + length
+                if pos + size > end:
+                    break
+                game.segments.append((pos + MOVES.size, length))
+            elif tag == b"K":
+                size = KEYFRAME.size + game.row * game.col
+                if pos + size > end:
+                    break
+                _, count, score, state = KEYFRAME.unpack_from(data, pos)
+                game.keyframes.append((count, score, state, pos + KEYFRAME.size))
+            elif tag == b"U":
+                size = UNDO.size
+                if pos + size > end:
+                    break
+                _, count = UNDO.unpack_from(data, pos)
+                if count > len(game):
+                    raise ValueError(f"{self.path}: bad frame at byte {pos}")
+                game.take_back(count)
+            else:
+                size = END.size
+                if pos + size > end:
+                    break
+                _, count, score, game_over = END.unpack_from(data, pos)
+                game.result = (count, score, bool(game_over))
+                yield game
+                game = None
+            pos += size
+
+        if game is not None:
+            yield game
+
+    def close(self) -> None:
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+    def __enter__(self) -> "RecordReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    from random import Random
+    from time import perf_counter
+
+    from simulate import simulate
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "games.rec"
+
+        # every game replays to its recorded result, from any keyframe
+        with RecordWriter.open(path, keyframe_interval=16) as writer:
+            simulate(4, 4, 200, "random", 0, record=writer)
+            simulate(3, 7, 20, "greedy", 1, record=writer)
+        with RecordReader(path) as reader:
+            games = list(reader)
+            assert len(games) == 220
+            for record in games[::10]:
+                assert record.result is not None
+                game = record.replay()
+                assert (len(record), game.score) == record.result[:2]
+                assert game.game_over == record.result[2]
+
+                fresh = Classic2048(record.row, record.col, record.seed)
+                directions = record.directions()
+                index = Random(record.seed).randint(0, len(directions))
+                for direction in directions[:index]:
+                    fresh.move(direction)
+                seeked = record.replay(index)
+                assert (seeked.bitboard, seeked.score) == (fresh.bitboard, fresh.score)
+            del games, record
+
+        # undone moves are dropped, whether they were written out or not
+        with RecordWriter.open(path, keyframe_interval=4) as writer:
+            game = Classic2048(4, 4, seed=7, keep_history=True)
+            writer.start_game(game)
+            for direction in DIRECTIONS * 10:
+                if game.move(direction):
+                    writer.add_move()
+                if writer.count == 6 and game.undone is None:
+                    # back over the keyframe after move 4
+                    for _ in range(3):
+                        game.undo()
+                        writer.undo()
+        with RecordReader(path) as reader:
+            record = list(reader)[-1]
+            assert record.replay().bitboard == game.bitboard
+            assert len(record) == writer.count
+            del record
+
+        # a crash mid-frame loses that frame only
+        with open(path, "rb+") as f:
+            f.truncate(f.seek(0, 2) - 3)
+        with RecordReader(path) as reader:
+            assert sum(1 for _ in reader) == 221
+
+        # scores past 32 bits, as of a 524288 tile on a large board
+        path.unlink()
+        with RecordWriter.open(path, keyframe_interval=1) as writer:
+            game = Classic2048(6, 9, seed=3)
+            writer.start_game(game)
+            game.move("left") or game.move("right")
+            game.score += 17_179_869_184
+            writer.add_move()
+        with RecordReader(path) as reader:
+            (record,) = reader
+            assert record.result is not None and record.result[1] == game.score
+            assert record.replay().score == game.score
+            del record
+
+        # games of another version are not appended to
+        old = Path(tmp) / "old.rec"
+        old.write_bytes(b"2048rec\x01")
+        try:
+            RecordWriter.open(old)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("appended to an old record file")
+        print("record check passed")
+
+        path.unlink()
+        with RecordWriter.open(path) as writer:
+            stats = simulate(4, 4, 2000, "random", 0, record=writer)
+        size = path.stat().st_size
+        start = perf_counter()
+        with RecordReader(path) as reader:
+            moves = sum(len(record) for record in reader)
+        elapsed = perf_counter() - start
+        assert moves == stats.moves
+        print(
+            f"{size / 2000:.0f} bytes/game, {size / stats.moves:.2f} bytes/move, "
+            f"{size * 1e6 / 2000 / 2**20:.0f} MB per million games, "
+            f"scanned {2000 / elapsed:.0f} games/s"
+        )
@@ -0,0 +1,102 @@
+import pygame
+from collections.abc import Sequence
+from pygame.typing import ColorLike
+
+type Layer = tuple[pygame.Surface, tuple[float, float]]  # (surface, top left)
+
+
+class DirtyRenderer:
+    """
+    Draws frames given as layers, back to front, onto a plain background.
+    Only the screen areas where a layer appeared, disappeared, moved or got
+    a different surface are repainted and passed to `pygame.display.update`.
+    Surfaces are compared by identity, so a layer that changes must come with
+    a new surface, as the tile cache and `Display` do.
+    """
+
+    def __init__(self, screen: pygame.Surface, bg_color: ColorLike):
+        self.screen = screen
+        self.bg_color = bg_color
+        self.previous: list[tuple[pygame.Surface, pygame.Rect]] = []
+        self.full_redraw: bool = True
+        # areas drawn by `render_area`, which the last frame does not cover
+        self.stale: list[pygame.Rect] = []
+
+    def invalidate(self) -> None:
+        """repaint the whole screen next frame, e.g. after it was resized"""
+        self.full_redraw = True
+
+    def render(self, layers: list[Layer]) -> list[pygame.Rect]:
+        """draw a frame and return the updated screen areas"""
+        frame = [(surface, surface.get_rect(topleft=pos)) for surface, pos in layers]
+
+        if self.full_redraw:
+            dirty = [self.screen.get_rect()]
+            self.full_redraw = False
+        else:
+            # (surface, rect) pairs on only one of the two frames
+            previous = {(id(s), tuple(r)): r for s, r in self.previous}
+            current = {(id(s), tuple(r)): r for s, r in frame}
+            changed = {
+                tuple(r): r
+                for key, r in (*previous.items(), *current.items())
+                if key not in previous or key not in current
+            }
+            dirty = list(changed.values()) + self.stale
+            screen_area = self.screen.get_width() * self.screen.get_height()
+            if sum(r.w * r.h for r in dirty) > screen_area / 2:
+                dirty = [self.screen.get_rect()]
+
+        # keep the surfaces alive, so that their ids are not reused
+        self.previous = frame
+        self.stale = []
+        if not dirty:
+            return dirty
+
+        for area in dirty:
+            self.screen.set_clip(area)
+            self.screen.fill(self.bg_color)
+            self.screen.blits(
+                [(s, r) for s, r in frame if r.colliderect(area)], doreturn=False
+            )
+        self.screen.set_clip(None)
+        pygame.display.update(dirty)
+        return dirty
+
+    def render_area(
+        self,
+        area: pygame.Rect,
+        layers: Sequence[tuple[pygame.Surface, Sequence[float]]],
+    ) -> None:
+        """
+        Repaint `area` from `layers` without comparing them to anything, for
+        animations changing it on every frame. The next `render` repaints it.
+        """
+        self.screen.set_clip(area)
+        self.screen.fill(self.bg_color)
+        self.screen.blits(layers, doreturn=False)
+        self.screen.set_clip(None)
+        pygame.display.update(area)
+        if area not in self.stale:
+            self.stale.append(area)
+
+
+if __name__ == "__main__":
+    import config
+
+    pygame.init()
+    screen = pygame.display.set_mode((400, 300))
+    renderer = DirtyRenderer(screen, config.BG_COLOR)
+
+    red = pygame.Surface((50, 50))
+    red.fill("red")
+    blue = pygame.Surface((50, 50))
+    blue.fill("blue")
+
+    assert renderer.render([(red, (0, 0)), (blue, (100, 0))]) == [screen.get_rect()]
+    # nothing changed
+    assert renderer.render([(red, (0, 0)), (blue, (100, 0))]) == []
+    # blue moved: its old and new place
+    assert len(renderer.render([(red, (0, 0)), (blue, (200, 0))])) == 2
+    assert screen.get_at((110, 10)) == config.BG_COLOR
+    assert screen.get_at((210, 10)) == pygame.Color("blue")
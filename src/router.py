@@ -0,0 +1,96 @@
+from collections.abc import Iterable
+
+import pygame
+
+from button import Button
+from display import Display
+
+MOUSE_EVENTS = frozenset(
+    {pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP}
+)
+
+
+class EventRouter:
+    """
+    Passes mouse events to the buttons they concern: those under the pointer,
+    found through a grid of `cell_size` pixel cells, and those the pointer is
+    leaving or that are still held down. Other events go to no button.
+    The grid is rebuilt only after some display or button moved.
+    """
+
+    def __init__(self, buttons: Iterable[Button], cell_size: int = 64):
+        self.buttons = list(buttons)
+        self.cell_size = cell_size
+        self.grid: dict[tuple[int, int], list[Button]] = {}
+        self.indexed_at: int | None = None  # `Display.geometry_changes`
+        # hovered or clicked buttons, they need to see the pointer leave
+        self.active: list[Button] = []
+
+    def cells(self, rect: pygame.Rect) -> Iterable[tuple[int, int]]:
+        size = self.cell_size
+        for x in range(rect.left // size, (rect.right - 1) // size + 1):
+            for y in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                yield x, y
+
+    def update_grid(self) -> None:
+        """re-index the buttons if any of them may have moved or changed size"""
+        if self.indexed_at == Display.geometry_changes:
+            return
+        self.indexed_at = Display.geometry_changes
+        self.grid = {}
+        for btn in self.buttons:
+            for cell in self.cells(btn.rect):
+                self.grid.setdefault(cell, []).append(btn)
+
+    def route(self, event: pygame.event.Event) -> bool:
+        """handle `event`, True if it reached a button"""
+        if event.type not in MOUSE_EVENTS:
+            return False
+        self.update_grid()
+
+        x, y = event.pos
+        under = [
+            btn
+            for btn in self.grid.get((x // self.cell_size, y // self.cell_size), ())
+            if btn.rect.collidepoint(x, y)
+        ]
+        targets = under + [btn for btn in self.active if btn not in under]
+        for btn in targets:
+            btn.handle_events(event)
+        self.active = [btn for btn in targets if btn.is_hovered or btn.is_clicked]
+        return bool(targets)
+
+
+if __name__ == "__main__":
+    pygame.init()
+
+    clicks = []
+    buttons = [
+        Button(pos=(100 + 200 * i, 100), disp_size=(150, 50), on_click=clicks.append)
+        for i in range(3)
+    ]
+    for i, btn in enumerate(buttons):
+        btn.on_click_params = ((i,), {})
+    router = EventRouter(buttons)
+
+    def mouse(type: int, pos: tuple[int, int]) -> bool:
+        return router.route(pygame.event.Event(type, pos=pos, button=1, rel=(0, 0)))
+
+    assert not mouse(pygame.MOUSEMOTION, (10, 10))
+    assert mouse(pygame.MOUSEMOTION, (300, 100)) and buttons[1].is_hovered
+    # leaving: the button still gets the event
+    assert mouse(pygame.MOUSEMOTION, (10, 10)) and not buttons[1].is_hovered
+    assert not mouse(pygame.MOUSEMOTION, (10, 10))
+
+    # moved buttons are found at their new place
+    buttons[2].pos = (700, 300)
+    mouse(pygame.MOUSEBUTTONDOWN, (700, 300))
+    mouse(pygame.MOUSEBUTTONUP, (700, 300))
+    assert clicks == [2]
+
+    # nothing moved, the grid is kept
+    grid = router.grid
+    mouse(pygame.MOUSEMOTION, (10, 10))
+    assert router.grid is grid
+    assert not router.route(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_a))
+    print("router check passed")
@@ -0,0 +1,199 @@
+import argparse
+import json
+from collections import Counter
+from statistics import mean, quantiles
+from time import perf_counter
+
+from classic2048 import Classic2048, SpawnRNG
+from expectimax import Expectimax, search_stats
+from policies import POLICIES, Policy
+from record import RecordWriter
+
+type GameResult = tuple[int, int, int]  # (score, max tile, moves)
+
+
+def play_game(
+    row: int,
+    col: int,
+    policy: Policy,
+    rng: SpawnRNG,
+    record: RecordWriter | None = None,
+) -> GameResult:
+    game = Classic2048(row, col, rng=rng)
+    if record:
+        record.start_game(game)
+    moves = 0
+    while (direction := policy(game)) is not None:
+        if game.move(direction):
+            moves += 1
+            if record:
+                record.add_move()
+    if record:
+        record.end_game()
+    return game.score, game.max_tile(), moves
+
+
+class SimulationStats:
+    def __init__(self) -> None:
+        self.games: int = 0
+        self.moves: int = 0
+        self.elapsed: float = 0.0
+        self.scores: list[int] = []
+        self.max_tiles: Counter[int] = Counter()
+        self.search: Counter[str] = Counter()  # summed `Expectimax.counters`
+
+    def add(self, result: GameResult) -> None:
+        score, max_tile, moves = result
+        self.games += 1
+        self.moves += moves
+        self.scores.append(score)
+        self.max_tiles[max_tile] += 1
+
+    def merge(self, other: "SimulationStats") -> None:
+        self.games += other.games
+        self.moves += other.moves
+        self.scores += other.scores
+        self.max_tiles += other.max_tiles
+        self.search += other.search
+
+    def summary(self) -> dict:
+        scores = sorted(self.scores)
+        deciles = (
+            quantiles(scores, n=10, method="inclusive")
+            if len(scores) > 1
+            else scores * 9
+        )
+        return {
+            "games": self.games,
+            "moves": self.moves,
+            "elapsed": self.elapsed,
+            "moves_per_sec": self.moves / self.elapsed if self.elapsed else 0.0,
+            "games_per_sec": self.games / self.elapsed if self.elapsed else 0.0,
+            "score": {
+                "mean": mean(scores) if scores else 0,
+                "min": scores[0] if scores else 0,
+                "p10": deciles[0] if scores else 0,
+                "p50": deciles[4] if scores else 0,
+                "p90": deciles[8] if scores else 0,
+                "max": scores[-1] if scores else 0,
+            },
+            "max_tile": {str(k): v for k, v in sorted(self.max_tiles.items())},
+            **({"search": search_stats(self.search)} if self.search else {}),
+        }
+
+    def report(self) -> str:
+        summary = self.summary()
+        score = summary["score"]
+        search = summary.get("search")
+        return "\n".join(
+            [
+                f"games: {self.games} ({summary['games_per_sec']:.1f} games/s)",
+                f"moves: {self.moves} ({summary['moves_per_sec']:.0f} moves/s)",
+                f"score: mean {score['mean']:.1f}, min {score['min']}, "
+                f"p10 {score['p10']:.0f}, p50 {score['p50']:.0f}, "
+                f"p90 {score['p90']:.0f}, max {score['max']}",
+                "max tile: "
+                + ", ".join(
+                    f"{tile}: {count / self.games:.1%}"
+                    for tile, count in sorted(self.max_tiles.items())
+                ),
+            ]
+            + (
+                [
+                    f"search: {search['nodes_per_sec']:.0f} nodes/s, "
+                    + (
+                        f"{search['cache_hit_rate']:.1%} cache hits, "
+                        if "cache_hit_rate" in search
+                        else ""
+                    )
+                    + f"depth {search['average_depth']:.2f}"
+                ]
+                if search
+                else []
+            )
+        )
+
+
+def game_rng(seed: int, index: int) -> SpawnRNG:
+    """stream of game `index`, the same whichever process plays it"""
+    return SpawnRNG(seed).spawn(index)
+
+
+def simulate(
+    row: int,
+    col: int,
+    games: int,
+    policy: str,
+    seed: int,
+    first_game: int = 0,
+    record: RecordWriter | None = None,
+) -> SimulationStats:
+    """
+    Play games `first_game` to `first_game + games - 1` of a seeded run,
+    appending them to `record` if given.
+    """
+    stats = SimulationStats()
+    start = perf_counter()
+    for index in range(first_game, first_game + games):
+        rng = game_rng(seed, index)
+        game_policy = POLICIES[policy](rng.spawn(0).seed)
+        stats.add(play_game(row, col, game_policy, rng, record))
+        if isinstance(searcher := getattr(game_policy, "__self__", None), Expectimax):
+            stats.search += searcher.counters()
+    stats.elapsed = perf_counter() - start
+    return stats
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="classic2048 simulate",
+        description="Play Classic 2048 games headlessly and report throughput.",
+    )
+    parser.add_argument("--row", type=int, default=4, choices=range(2, 7))
+    parser.add_argument("--col", type=int, default=4, choices=range(2, 10))
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--policy", default="random", choices=POLICIES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="number of processes, 0 for one per core",
+    )
+    parser.add_argument("--json", action="store_true", help="print a JSON summary")
+    parser.add_argument(
+        "--record", metavar="PATH", help="append the games to this record file"
+    )
+    args = parser.parse_args(argv)
+
+    record = RecordWriter.open(args.record) if args.record else None
+    if args.workers == 1:
+        stats = simulate(
+            args.row, args.col, args.games, args.policy, args.seed, record=record
+        )
+    else:
+        from parallel import run_parallel
+
+        stats = run_parallel(
+            args.row,
+            args.col,
+            args.games,
+            args.policy,
+            args.seed,
+            args.workers or None,
+            record=record,
+        )
+    if record:
+        record.close()
+
+    if args.json:
+        print(json.dumps(stats.summary(), indent=2))
+    else:
+        print(
+            f"{args.row}x{args.col}, policy {args.policy}, seed {args.seed}\n"
+            + stats.report()
+        )
+
+
+if __name__ == "__main__":
+    main()
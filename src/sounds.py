@@ -0,0 +1,63 @@
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+
+import pygame
+
+
+class LazySound:
+    """
+    `pygame.mixer.Sound` that is only loaded when first played,
+    or ahead of that by `preload`.
+    """
+
+    def __init__(self, path: Path, volume: float = 1.0):
+        self.path = path
+        self.volume = volume
+        self._sound: pygame.mixer.Sound | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._sound is not None
+
+    @property
+    def sound(self) -> pygame.mixer.Sound:
+        with self._lock:
+            if self._sound is None:
+                sound = pygame.mixer.Sound(self.path)
+                sound.set_volume(self.volume)
+                self._sound = sound
+            return self._sound
+
+    def play(self, loops: int = 0) -> pygame.mixer.Channel | None:
+        return self.sound.play(loops)
+
+
+def preload(sounds: Iterable[LazySound]) -> threading.Thread:
+    """load `sounds` on a background thread, so that they are ready when played"""
+
+    def load() -> None:
+        for sound in sounds:
+            sound.sound
+
+    thread = threading.Thread(target=load, name="sounds", daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == "__main__":
+    from time import perf_counter
+
+    from base_path import base_path
+
+    pygame.init()
+    sounds_path = base_path / "assets" / "sounds"
+    sounds = [LazySound(path, 0.5) for path in sorted(sounds_path.glob("*.*"))]
+
+    start = perf_counter()
+    thread = preload(sounds)
+    print(f"preload started after {(perf_counter() - start) * 1000:.2f} ms")
+    thread.join()
+    print(f"all loaded after {(perf_counter() - start) * 1000:.2f} ms")
+    assert all(sound.is_loaded for sound in sounds)
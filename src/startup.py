@@ -0,0 +1,88 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from statistics import median
+
+import config
+
+
+def measure() -> dict[str, float]:
+    """start the app in this process and time it up to its first frame"""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    from main import App  # not imported before, so the imports are timed too
+
+    app = App()
+    app.render()
+    app.startup.lap("first frame")
+    return app.startup.to_dict()
+
+
+def measure_in_subprocess() -> dict[str, float]:
+    """`measure` in a fresh interpreter, nothing is imported or cached yet"""
+    result = subprocess.run(
+        [sys.executable, __file__, "--once"],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYGAME_HIDE_SUPPORT_PROMPT": "1"},
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="startup",
+        description="Time Classic 2048 from imports to its first frame.",
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=config.STARTUP_BUDGET,
+        help="fail if the median time to first frame exceeds this many seconds",
+    )
+    parser.add_argument("--out", type=Path, help="write a JSON report here")
+    parser.add_argument("--once", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.once:
+        print(json.dumps(measure()))
+        return
+
+    samples = [measure_in_subprocess() for _ in range(args.runs)]
+    medians = {phase: median(s[phase] for s in samples) for phase in samples[0]}
+    budget_ms = args.budget * 1000
+    passed = medians["total"] <= budget_ms
+
+    width = max(map(len, medians))
+    for phase, ms in medians.items():
+        print(f"{phase:<{width}}  {ms:8.1f} ms")
+    print(
+        f"median of {args.runs} runs, budget {budget_ms:.0f} ms: "
+        + ("passed" if passed else "FAILED")
+    )
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "runs": args.runs,
+                    "budget_ms": budget_ms,
+                    "passed": passed,
+                    "median_ms": medians,
+                    "samples_ms": samples,
+                },
+                f,
+                indent=2,
+            )
+
+    if not passed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
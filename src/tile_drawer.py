@@ -4,6 +4,10 @@ from pygame.typing import ColorLike
 import config
 from font import font
 
+type TileKey = tuple[int, int, ColorLike, ColorLike]  # (num, size, font, tile color)
+
+tile_cache: dict[TileKey, pygame.Surface] = {}
+
 
 def draw_tile(
     # font settings
@@ -61,14 +65,32 @@ def draw_tile(
     return surface
 
 
-def draw_tile_using_config(num: int) -> pygame.Surface:
+def draw_tile_using_config(num: int, tile_size: int | None = None) -> pygame.Surface:
+    """
+    Tile drawn with the colors in `config`, `config.TILE_SIZE` big by default.
+    Tiles are drawn once and cached, the returned surface is shared and must
+    not be drawn on.
+    """
     index = num if num in config.FONT_COLOR else -1
-    return draw_tile(
-        content=num,
-        font_color=config.FONT_COLOR[index],
-        tile_size=config.TILE_SIZE,
-        tile_color=config.TILE_COLOR[index],
-    )
+    tile_size = tile_size if tile_size is not None else config.TILE_SIZE
+    key = (num, tile_size, config.FONT_COLOR[index], config.TILE_COLOR[index])
+    if (surface := tile_cache.get(key)) is None:
+        surface = draw_tile(
+            content=num,
+            font_color=config.FONT_COLOR[index],
+            tile_size=tile_size,
+            tile_color=config.TILE_COLOR[index],
+        )
+        # match the screen's pixel format so that blitting is a plain copy
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        tile_cache[key] = surface
+    return surface
+
+
+def clear_tile_cache() -> None:
+    """drop all cached tiles, call after changing the tile size or colors"""
+    tile_cache.clear()
 
 
 if __name__ == "__main__":
@@ -81,6 +103,10 @@ if __name__ == "__main__":
             draw_tile_using_config(2**i if i != 0 else 0),
             ((i + 1) * config.TILE_SIZE, 450),
         )
+    # drawn once, then served from the cache
+    assert draw_tile_using_config(2) is draw_tile_using_config(2)
+    clear_tile_cache()
+    assert not tile_cache
 
     # region
     screen.blit(draw_tile(content="+", tile_size=45), (100, 700))
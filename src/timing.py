@@ -0,0 +1,55 @@
+import json
+from pathlib import Path
+from time import perf_counter
+
+
+class StartupTimer:
+    """Splits the time since `start` into consecutive, named phases."""
+
+    def __init__(self, start: float | None = None):
+        self.start = start if start is not None else perf_counter()
+        self.last = self.start
+        self.phases: dict[str, float] = {}
+
+    def lap(self, phase: str) -> float:
+        """end `phase` now, return its duration in seconds"""
+        now = perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self.last
+        self.last = now
+        return self.phases[phase]
+
+    @property
+    def total(self) -> float:
+        return self.last - self.start
+
+    def to_dict(self) -> dict[str, float]:
+        """phase durations and their total in milliseconds"""
+        return {
+            **{phase: t * 1000 for phase, t in self.phases.items()},
+            "total": self.total * 1000,
+        }
+
+    def write(self, path: Path) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def report(self) -> str:
+        width = max(map(len, self.phases), default=0)
+        return "\n".join(
+            [
+                f"{phase:<{width}}  {t * 1000:8.1f} ms"
+                for phase, t in self.phases.items()
+            ]
+            + [f"{'total':<{width}}  {self.total * 1000:8.1f} ms"]
+        )
+
+
+if __name__ == "__main__":
+    from time import sleep
+
+    timer = StartupTimer()
+    sleep(0.01)
+    timer.lap("sleep")
+    sum(range(10**6))
+    timer.lap("sum")
+    print(timer.report())